@@ -0,0 +1,60 @@
+"""
+多摄像头批量检测基准测试
+
+比较逐帧调用 FaceDetector.detect 与一次 detect_batch 的吞吐量（帧/秒）。
+
+用法:
+    python -m benchmarks.bench_detect_batch --model yolov8n-face.pt --batch-sizes 1,2,4,8
+"""
+import argparse
+import time
+import cv2
+import numpy as np
+from typing import List
+
+from boss_sentinel.detector import FaceDetector
+
+
+def _make_frames(count: int, width: int, height: int, image: str = "") -> List[np.ndarray]:
+    """构造测试帧：指定图片或随机噪声"""
+    if image:
+        frame = cv2.resize(cv2.imread(image), (width, height))
+        return [frame.copy() for _ in range(count)]
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 255, (height, width, 3), dtype=np.uint8) for _ in range(count)]
+
+
+def _throughput(fn, frames: List[np.ndarray], iterations: int) -> float:
+    """运行 fn(frames) 若干次，返回帧/秒"""
+    fn(frames)  # 预热
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(frames)
+    elapsed = time.perf_counter() - start
+    return len(frames) * iterations / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量人脸检测基准测试")
+    parser.add_argument("--model", default="yolov8n-face.pt", help="YOLO模型路径")
+    parser.add_argument("--batch-sizes", default="1,2,4,8", help="批大小列表（逗号分隔）")
+    parser.add_argument("--iterations", type=int, default=20, help="每个批大小的迭代次数")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--image", default="", help="测试图片路径（默认随机噪声）")
+    parser.add_argument("--gpu", action="store_true", help="使用GPU")
+    args = parser.parse_args()
+
+    detector = FaceDetector(args.model, use_gpu=args.gpu)
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",") if b.strip()]
+
+    print(f"{'batch':>6} {'sequential fps':>16} {'batched fps':>14} {'speedup':>9}")
+    for batch_size in batch_sizes:
+        frames = _make_frames(batch_size, args.width, args.height, args.image)
+        sequential = _throughput(lambda fs: [detector.detect(f) for f in fs], frames, args.iterations)
+        batched = _throughput(detector.detect_batch, frames, args.iterations)
+        print(f"{batch_size:>6} {sequential:>16.1f} {batched:>14.1f} {batched / sequential:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
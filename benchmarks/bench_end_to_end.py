@@ -0,0 +1,434 @@
+"""
+端到端吞吐量与延迟基准测试
+
+用合成画面或录制素材通过 SentinelMonitor.run() 驱动真实的运行模式（顺序/流水线/多进程），统计各组合下的:
+- 输入帧率 / 实际处理帧率
+- 决策延迟 p50/p95/p99（帧采集到该帧完成判定；被跳过或被丢弃的帧计到下一次处理完成）
+- CPU 占用与内存（含多进程模式的工作进程，需要psutil），以及相对组合开始时的内存增量
+
+参数矩阵: 运行模式 × 摄像头数 × 每帧人脸数 × 人脸库规模 × frame_skip。
+每个组合在独立子进程中运行，并先处理 --warmup 帧（不计时）再开始统计。
+默认使用桩模型（不需要模型权重和GPU），衡量的是模型之外的流水线开销；
+可用 --detect-ms/--embed-ms 模拟模型耗时，或 --models real 使用真实模型。
+
+用法:
+    python -m benchmarks.bench_end_to_end --cameras 1,4 --faces 0,1,5 --gallery 10,1000 --frame-skip 1,3
+    python -m benchmarks.bench_end_to_end --modes pipeline,multiprocess --workers 2 --detect-ms 20 --embed-ms 5
+    python -m benchmarks.bench_end_to_end --source clips/office.mp4 --models real --frames 300
+"""
+import os
+import sys
+import json
+import time
+import queue
+import argparse
+import functools
+import itertools
+import multiprocessing
+import shutil
+import tempfile
+import threading
+import numpy as np
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+
+from boss_sentinel.config import SentinelConfig
+from boss_sentinel.monitor import SentinelMonitor
+from boss_sentinel.detector import FaceDetector
+from boss_sentinel.recognizer import FaceRecognizer
+from boss_sentinel.backends import InferenceBackend
+
+MODES = ("sequential", "pipeline", "multiprocess")
+
+
+class _StubYOLO:
+    """模拟YOLO模型：每帧返回固定数量、缓慢平移的人脸框"""
+
+    def __init__(self, faces: int, cost_ms: float = 0.0):
+        self.faces = faces
+        self.cost_ms = cost_ms
+        self.calls = 0
+
+    def _boxes(self, image: np.ndarray) -> np.ndarray:
+        height, width = image.shape[:2]
+        cols = max(1, int(np.ceil(np.sqrt(self.faces))))
+        size = min(width, height) / (cols + 1) * 0.6
+        shift = self.calls % 20
+        boxes = []
+        for i in range(self.faces):
+            x = (i % cols + 0.5) * width / (cols + 1) + shift
+            y = (i // cols + 0.5) * height / (cols + 1)
+            boxes.append([x, y, x + size, y + size, 0.9, 0])
+        return np.array(boxes, dtype=np.float32).reshape(-1, 6)
+
+    def __call__(self, images, **kwargs):
+        images = images if isinstance(images, list) else [images]
+        self.calls += 1
+        if self.cost_ms:
+            time.sleep(self.cost_ms * len(images) / 1000)
+        return [SimpleNamespace(boxes=SimpleNamespace(data=self._boxes(image))) for image in images]
+
+
+class StubDetector(FaceDetector):
+    """桩检测器：复用 FaceDetector 的缩放与结果解析，模型替换为 _StubYOLO"""
+
+    def __init__(self, faces: int, cost_ms: float = 0.0, input_size: int = 0):
+        self.backend = "stub"
+        self.device = "cpu"
+        self.input_size = input_size
+        self.model = _StubYOLO(faces, cost_ms)
+
+
+class _StubEmbeddingBackend(InferenceBackend):
+    """模拟FaceNet：输出随机特征，其中 match_rate 比例接近人脸库中的某个人"""
+
+    name = "stub"
+
+    def __init__(self, gallery: np.ndarray, match_rate: float = 0.0, cost_ms: float = 0.0, seed: int = 0):
+        self.gallery = gallery
+        self.match_rate = match_rate
+        self.cost_ms = cost_ms
+        self.rng = np.random.default_rng(seed)
+
+    def run(self, batch: np.ndarray) -> np.ndarray:
+        if self.cost_ms:
+            time.sleep(self.cost_ms * len(batch) / 1000)
+        embeddings = self.rng.standard_normal((len(batch), 512)).astype(np.float32)
+        if len(self.gallery) and self.match_rate > 0:
+            hits = self.rng.random(len(batch)) < self.match_rate
+            people = self.rng.integers(0, len(self.gallery), hits.sum())
+            embeddings[hits] = self.gallery[people] * 20 + embeddings[hits] * 0.1
+        return embeddings
+
+
+class StubRecognizer(FaceRecognizer):
+    """桩识别器：随机人脸库，复用 FaceRecognizer 的预处理与矩阵比对"""
+
+    def __init__(self, gallery_size: int, match_rate: float = 0.0, cost_ms: float = 0.0, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        gallery = rng.standard_normal((gallery_size, 512)).astype(np.float32)
+        gallery /= np.linalg.norm(gallery, axis=1, keepdims=True)
+
+        self.known_faces_dir = ""
+        self.resnet = None
+        self.precision = "fp32"
+        # 查询特征使用独立的随机流，否则前N个特征会与人脸库完全相同
+        self.backend = _StubEmbeddingBackend(gallery, match_rate, cost_ms, seed + 1)
+        self.model_id = "stub"
+        self.load_stats = {}
+        self.known_embeddings = {f"person_{i:05d}": gallery[i:i + 1] for i in range(gallery_size)}
+        self._rebuild_gallery()
+
+
+def _stub_models(faces: int, detect_ms: float, detect_size: int,
+                 gallery: int, match_rate: float, embed_ms: float) -> Tuple[StubDetector, StubRecognizer]:
+    """创建桩检测器与识别器（模块级函数，可pickle后交给多进程模式的工作进程调用）"""
+    return StubDetector(faces, detect_ms, detect_size), StubRecognizer(gallery, match_rate, embed_ms)
+
+
+def _cpu_seconds() -> float:
+    """本进程及子进程（多进程模式的工作进程，需要psutil）累计CPU时间"""
+    total = time.process_time()
+    try:
+        import psutil
+    except ImportError:
+        return total
+    for child in psutil.Process().children(recursive=True):
+        try:
+            times = child.cpu_times()
+            total += times.user + times.system
+        except psutil.Error:
+            pass
+    return total
+
+
+def _memory_mb() -> float:
+    """本进程及子进程内存（MB）：优先使用psutil的RSS，否则使用本进程峰值RSS，都不可用时返回NaN"""
+    try:
+        import psutil
+        process = psutil.Process()
+        rss = process.memory_info().rss
+        for child in process.children(recursive=True):
+            try:
+                rss += child.memory_info().rss
+            except psutil.Error:
+                pass
+        return rss / 2 ** 20
+    except ImportError:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        return float('nan')
+
+
+class _BenchmarkMonitor(SentinelMonitor):
+    """
+    通过 run() 驱动真实运行模式，统计每帧的决策延迟
+
+    - 包装各摄像头的 read_latest，记录读到的帧（序号、采集时间）
+    - 一帧处理完成时，该摄像头序号不大于它的帧（含被跳过的帧）都得到决策
+    - 每个摄像头先处理 warmup 帧（首次推理、首次跟踪匹配时的导入等）后才开始计时
+    - 计时后读到 target 帧即视为帧来源结束，run() 按各模式的正常流程退出
+    - 不真正锁屏；与正式运行一样，命中目标人物后 run() 结束
+    """
+
+    def __init__(self, *args, warmup: int = 10, target: int = 0, **kwargs):
+        self.warmup = warmup
+        self.target = target
+        self.measuring = False
+        self.latencies: List[float] = []
+        self.frames_seen = 0
+        self.frames_processed = 0
+        self.locks = 0
+        self.start: Optional[Tuple[float, float]] = None  # (墙钟, CPU时间)
+        self.end: Optional[Tuple[float, float, float]] = None  # (墙钟, CPU时间, 内存MB)
+        self.last_done = 0.0
+        self._lock = threading.Lock()
+        self._pending: Dict[int, List[Tuple[int, float]]] = {}  # 摄像头 -> 未决策的 (序号, 采集时间)
+        self._latest_seq: Dict[int, int] = {}
+        self._start_seq: Dict[int, int] = {}
+        self._warm: Dict[int, int] = {}
+        self._selected: Dict[int, bool] = {}
+        super().__init__(*args, **kwargs)
+
+    def _init_cameras(self, sources):
+        cameras = super()._init_cameras(sources)
+        for reader in cameras:
+            reader.read_latest = functools.partial(self._read, reader.read_latest, reader.camera_idx)
+        return cameras
+
+    def _read(self, read_latest, camera_idx: int):
+        if self._exhausted():
+            return None
+        packet = read_latest()
+        if packet is None:
+            return None
+        with self._lock:
+            self._latest_seq[camera_idx] = packet.seq
+            self._pending.setdefault(camera_idx, []).append((packet.seq, packet.timestamp))
+            if self.measuring:
+                self.frames_seen += 1
+                if self.frames_seen >= self.target:
+                    self._record_end()
+            elif self.warmup <= 0:
+                self._start_measuring()
+        return packet
+
+    def _exhausted(self) -> bool:
+        return self.measuring and self.frames_seen >= self.target
+
+    def _start_measuring(self) -> None:
+        """预热完成：丢弃之前读到的帧，开始计时"""
+        self._start_seq = dict(self._latest_seq)
+        self._pending.clear()
+        self.start = (time.perf_counter(), _cpu_seconds())
+        self.measuring = True
+
+    def _record_end(self) -> None:
+        """记录计时结束时的墙钟、CPU时间与内存（此时工作进程仍在运行）"""
+        if self.end is None and self.start is not None:
+            self.end = (time.perf_counter(), _cpu_seconds(), _memory_mb())
+
+    def _should_process(self, camera_idx: int) -> bool:
+        selected = super()._should_process(camera_idx)
+        self._selected[camera_idx] = selected
+        return selected
+
+    def _frame_done(self, camera_idx: int, seq: int) -> None:
+        now = time.time()
+        with self._lock:
+            if not self.measuring:
+                self._warm[camera_idx] = self._warm.get(camera_idx, 0) + 1
+                if len(self._warm) == len(self.cameras) and min(self._warm.values()) >= self.warmup:
+                    self._start_measuring()
+                return
+            if seq <= self._start_seq.get(camera_idx, 0):
+                return
+            pending = self._pending.get(camera_idx, [])
+            self.latencies.extend(now - timestamp for frame_seq, timestamp in pending if frame_seq <= seq)
+            self._pending[camera_idx] = [item for item in pending if item[0] > seq]
+            self.frames_processed += 1
+            self.last_done = time.perf_counter()
+
+    # 顺序模式下 process_frame(s) 返回时本轮读到的帧即处理完成
+    def process_frame(self, frame: np.ndarray, camera_idx: int) -> bool:
+        try:
+            return super().process_frame(frame, camera_idx)
+        finally:
+            if self._selected.pop(camera_idx, False):
+                self._frame_done(camera_idx, self._latest_seq[camera_idx])
+
+    def process_frames(self, frames: List[Tuple[int, np.ndarray]]) -> bool:
+        try:
+            return super().process_frames(frames)
+        finally:
+            for camera_idx, _ in frames:
+                if self._selected.pop(camera_idx, False):
+                    self._frame_done(camera_idx, self._latest_seq[camera_idx])
+
+    def _sources_drained(self) -> bool:
+        drained = self._exhausted() or super()._sources_drained()
+        if drained:
+            self._record_end()
+        return drained
+
+    def _lock_screen(self) -> None:
+        self.locks += 1
+        self._record_end()
+
+
+def run_case(mode: str, cameras: int, faces: int, gallery: int, frame_skip: int, args) -> Dict[str, float]:
+    """运行一个参数组合（通过 run() 驱动指定运行模式），返回统计结果"""
+    memory_start = _memory_mb()
+    known_faces_dir = tempfile.mkdtemp(prefix="sentinel-bench-")
+    source = args.source if args.source != "synthetic" else f"synthetic:{args.width}x{args.height}:{max(1, faces)}"
+    config = SentinelConfig(
+        known_faces_dir=args.known_faces if args.models == "real" else known_faces_dir,
+        model_path=args.model,
+        log_file=os.devnull,
+        show_feed=False,
+        cameras=[source] * cameras,
+        frame_skip=frame_skip,
+        source_pacing=args.pacing,
+        source_fps=args.fps,
+        watch_known_faces=False,
+        embedding_cache=args.models == "real",
+        detect_size=args.detect_size,
+        pipeline=mode == "pipeline",
+        worker_processes=args.workers if mode == "multiprocess" else 0,
+    )
+
+    models = {}
+    if args.models == "stub":
+        factory = functools.partial(_stub_models, faces, args.detect_ms, args.detect_size,
+                                    gallery, args.match_rate, args.embed_ms)
+        if mode == "multiprocess":
+            models['worker_models'] = factory
+        else:
+            models['detector'], models['recognizer'] = factory()
+    monitor = _BenchmarkMonitor(config, lazy_load=True, warmup=args.warmup, target=args.frames * cameras,
+                                **models)
+    try:
+        monitor.run()
+    finally:
+        shutil.rmtree(known_faces_dir, ignore_errors=True)
+
+    start_wall, start_cpu = monitor.start or (0.0, 0.0)
+    end_wall, end_cpu, memory = monitor.end or (start_wall, start_cpu, _memory_mb())
+    wall = end_wall - start_wall
+    processed_wall = max(monitor.last_done, end_wall) - start_wall
+    latency_ms = np.array(monitor.latencies) * 1000 if monitor.latencies else np.zeros(1)
+    return {
+        'mode': mode,
+        'cameras': cameras,
+        'faces': faces,
+        'gallery': gallery,
+        'frame_skip': frame_skip,
+        'fps': monitor.frames_seen / wall if wall > 0 else 0.0,
+        'processed_fps': monitor.frames_processed / processed_wall if processed_wall > 0 else 0.0,
+        'p50_ms': float(np.percentile(latency_ms, 50)),
+        'p95_ms': float(np.percentile(latency_ms, 95)),
+        'p99_ms': float(np.percentile(latency_ms, 99)),
+        'cpu_percent': (end_cpu - start_cpu) / wall * 100 if wall > 0 else 0.0,
+        'memory_mb': memory,
+        'memory_delta_mb': memory - memory_start,
+        'locks': monitor.locks,
+    }
+
+
+def _case_process(results: "multiprocessing.Queue", *case) -> None:
+    """子进程入口：运行一个参数组合，结果放入队列"""
+    # 模型加载、摄像头与检测日志（含工作进程的输出）不输出到控制台，避免打断结果表格
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, sys.stdout.fileno())
+    try:
+        results.put(('ok', run_case(*case)))
+    except Exception as e:
+        results.put(('error', f"{type(e).__name__}: {e}"))
+
+
+def run_case_in_subprocess(*case) -> Dict[str, float]:
+    """
+    在独立子进程中运行一个参数组合
+
+    每个组合从干净的进程开始，内存与导入状态不受之前组合影响。
+    """
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    process = ctx.Process(target=_case_process, args=(results,) + case)
+    process.start()
+    try:
+        while True:
+            try:
+                status, value = results.get(timeout=1.0)
+                break
+            except queue.Empty:
+                if not process.is_alive():
+                    raise RuntimeError(f"基准测试子进程异常退出 (exit code {process.exitcode})")
+    finally:
+        process.join()
+    if status == 'error':
+        raise RuntimeError(f"基准测试用例失败: {value}")
+    return value
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="端到端吞吐量与延迟基准测试")
+    parser.add_argument("--modes", default=",".join(MODES), help="运行模式列表（sequential/pipeline/multiprocess）")
+    parser.add_argument("--cameras", default="1,2,4", help="摄像头数列表（逗号分隔）")
+    parser.add_argument("--faces", default="0,1,5", help="每帧人脸数列表（仅桩模型）")
+    parser.add_argument("--gallery", default="10,1000", help="人脸库规模列表（仅桩模型）")
+    parser.add_argument("--frame-skip", default="1,3", help="frame_skip 列表")
+    parser.add_argument("--frames", type=int, default=200, help="每个摄像头的计时帧数")
+    parser.add_argument("--warmup", type=int, default=10, help="每个摄像头开始计时前处理的帧数")
+    parser.add_argument("--workers", type=int, default=2, help="多进程模式的工作进程数")
+    parser.add_argument("--source", default="synthetic", help="帧来源：synthetic、视频文件或图像目录")
+    parser.add_argument("--pacing", default="fast", choices=("fast", "realtime"), help="帧来源节流模式")
+    parser.add_argument("--fps", type=float, default=25.0, help="合成画面帧率（realtime 模式）")
+    parser.add_argument("--width", type=int, default=640, help="合成画面宽度")
+    parser.add_argument("--height", type=int, default=480, help="合成画面高度")
+    parser.add_argument("--models", default="stub", choices=("stub", "real"), help="桩模型或真实模型")
+    parser.add_argument("--model", default="yolov8n-face.pt", help="YOLO模型路径（真实模型）")
+    parser.add_argument("--known-faces", default="known_faces", help="人脸库目录（真实模型）")
+    parser.add_argument("--detect-size", type=int, default=0, help="检测器输入尺寸")
+    parser.add_argument("--detect-ms", type=float, default=0.0, help="桩检测器每帧模拟耗时（毫秒）")
+    parser.add_argument("--embed-ms", type=float, default=0.0, help="桩识别器每张人脸模拟耗时（毫秒）")
+    parser.add_argument("--match-rate", type=float, default=0.0,
+                        help="桩识别器命中人脸库的比例（命中即结束该组合，与正式运行一致）")
+    parser.add_argument("--json", default="", help="结果另存为JSON文件")
+    args = parser.parse_args(argv)
+
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    for mode in modes:
+        if mode not in MODES:
+            parser.error(f"未知的运行模式: {mode}")
+    faces_list = _int_list(args.faces) if args.models == "stub" else [0]
+    gallery_list = _int_list(args.gallery) if args.models == "stub" else [0]
+
+    print(f"{'mode':>12} {'cams':>4} {'faces':>5} {'gallery':>7} {'skip':>4} | {'fps':>8} {'proc fps':>8} | "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} | {'cpu %':>6} {'mem MB':>7} {'Δmem MB':>7}")
+    results = []
+    for mode, cameras, faces, gallery, frame_skip in itertools.product(
+            modes, _int_list(args.cameras), faces_list, gallery_list, _int_list(args.frame_skip)):
+        r = run_case_in_subprocess(mode, cameras, faces, gallery, frame_skip, args)
+        results.append(r)
+        print(f"{mode:>12} {cameras:>4} {faces:>5} {gallery:>7} {frame_skip:>4} | "
+              f"{r['fps']:>8.1f} {r['processed_fps']:>8.1f} | "
+              f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} | "
+              f"{r['cpu_percent']:>6.1f} {r['memory_mb']:>7.1f} {r['memory_delta_mb']:>7.1f}"
+              + (f"  (locked after {r['locks']} match)" if r['locks'] else ""))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -46,4 +46,7 @@ _preload_torch_dlls()
 from boss_sentinel.gui import run_gui
 
 if __name__ == "__main__":
+    # 打包为EXE后，多进程模式的工作进程需要由此识别并接管
+    import multiprocessing
+    multiprocessing.freeze_support()
     run_gui()
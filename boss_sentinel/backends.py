@@ -0,0 +1,241 @@
+"""
+推理后端
+
+FaceDetector 与 FaceRecognizer 共用的推理后端抽象:
+- torch: 原生 PyTorch 推理（默认）
+- onnx: ONNX Runtime CPU 推理，由现有权重导出，适合无GPU的机器
+
+命令行导出并检查一致性:
+    python -m boss_sentinel.backends --model yolov8n-face.pt
+"""
+import os
+import numpy as np
+from typing import Any, Dict, List, Optional
+
+BACKENDS = ("torch", "onnx")
+FACENET_ONNX_PATH = "facenet-vggface2.onnx"
+
+
+class InferenceBackend:
+    """推理后端接口：输入NCHW float32批次，输出numpy数组"""
+
+    name = "base"
+
+    def run(self, batch: np.ndarray) -> np.ndarray:
+        """
+        执行一次前向推理
+
+        参数:
+            batch: 输入批次 (N, C, H, W)，float32
+
+        返回:
+            模型输出
+        """
+        raise NotImplementedError
+
+
+class TorchBackend(InferenceBackend):
+    """PyTorch 推理后端"""
+
+    name = "torch"
+
+    def __init__(self, module, device: str = "cpu"):
+        """
+        参数:
+            module: 已设置为 eval() 的 torch.nn.Module
+            device: 推理设备
+        """
+        import torch
+        self._torch = torch
+        self.device = device
+        self.module = module.to(device).eval()
+
+    def run(self, batch: np.ndarray) -> np.ndarray:
+        torch = self._torch
+        with torch.no_grad():
+            output = self.module(torch.from_numpy(np.ascontiguousarray(batch)).to(self.device))
+        return output.cpu().numpy()
+
+
+class OnnxBackend(InferenceBackend):
+    """ONNX Runtime CPU 推理后端"""
+
+    name = "onnx"
+
+    def __init__(self, model_path: str, num_threads: int = 0):
+        """
+        参数:
+            model_path: ONNX模型路径
+            num_threads: 算子内并行线程数，0表示由ONNX Runtime自动选择
+        """
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError("ONNX 后端需要安装 onnxruntime: pip install onnxruntime") from e
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+
+        self.model_path = model_path
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def run(self, batch: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self.input_name: np.ascontiguousarray(batch, dtype=np.float32)})[0]
+
+
+def export_facenet_onnx(resnet, onnx_path: str = FACENET_ONNX_PATH, opset: int = 17) -> str:
+    """
+    将 InceptionResnetV1 导出为ONNX（批大小可变）
+
+    返回:
+        导出的文件路径
+    """
+    import torch
+
+    dummy = torch.zeros(1, 3, 160, 160)
+    with torch.no_grad():
+        torch.onnx.export(
+            resnet.eval(), dummy, onnx_path,
+            input_names=["input"], output_names=["embedding"],
+            dynamic_axes={"input": {0: "batch"}, "embedding": {0: "batch"}},
+            opset_version=opset,
+        )
+    return onnx_path
+
+
+def yolo_onnx_path(model_path: str) -> str:
+    """YOLO权重对应的ONNX文件路径（与ultralytics导出位置一致）"""
+    return os.path.splitext(model_path)[0] + ".onnx"
+
+
+def export_yolo_onnx(model_path: str) -> str:
+    """
+    使用 ultralytics 将YOLO权重导出为ONNX（输入尺寸可变）
+
+    返回:
+        导出的文件路径
+    """
+    from ultralytics import YOLO
+
+    return str(YOLO(model_path).export(format="onnx", dynamic=True))
+
+
+def check_parity(reference: InferenceBackend, candidate: InferenceBackend,
+                 batch: np.ndarray) -> Dict[str, float]:
+    """
+    比较两个后端在同一输入上的输出
+
+    返回:
+        {'max_abs_diff': 最大绝对误差, 'min_cosine': 逐样本最小余弦相似度}
+    """
+    expected = reference.run(batch).reshape(len(batch), -1)
+    actual = candidate.run(batch).reshape(len(batch), -1)
+    norms = np.linalg.norm(expected, axis=1) * np.linalg.norm(actual, axis=1)
+    cosine = np.sum(expected * actual, axis=1) / np.maximum(norms, 1e-12)
+    return {
+        'max_abs_diff': float(np.max(np.abs(expected - actual))),
+        'min_cosine': float(np.min(cosine)),
+    }
+
+
+def detector_parity_frames(image_paths: Optional[List[str]] = None) -> List[np.ndarray]:
+    """
+    读取检测一致性检查用的图片
+
+    随机噪声上检测不到人脸，比较0个检测框没有意义，因此默认使用 ultralytics 自带的含人脸示例图片。
+
+    参数:
+        image_paths: 图片路径列表，为空时使用 ultralytics 示例图片
+
+    返回:
+        BGR图像列表（无法读取的图片会被跳过）
+    """
+    import cv2
+
+    if not image_paths:
+        from ultralytics.utils import ASSETS
+        image_paths = [str(ASSETS / name) for name in ("zidane.jpg", "bus.jpg")]
+    frames = [cv2.imread(path) for path in image_paths]
+    return [frame for frame in frames if frame is not None]
+
+
+def check_detector_parity(model_path: str, onnx_path: str, frames: List[np.ndarray],
+                          confidence_threshold: float = 0.5, min_iou: float = 0.9) -> Dict[str, Any]:
+    """
+    比较PyTorch与ONNX版YOLO在同一批图像上的检测框
+
+    返回:
+        {'boxes_torch': .., 'boxes_onnx': .., 'mean_iou': 按最优匹配计算的平均IoU（无可比较的框时为nan）,
+         'status': "pass" / "fail" / "inconclusive"（两个模型都没有检测到人脸，无法判断）}
+    """
+    from ultralytics import YOLO
+    from .tracker import FaceTracker
+    from scipy.optimize import linear_sum_assignment
+
+    def boxes(model) -> List[np.ndarray]:
+        results = model(frames, verbose=False)
+        return [
+            np.array([b[:4] for b in r.boxes.data.tolist() if b[4] >= confidence_threshold]).reshape(-1, 4)
+            for r in results
+        ]
+
+    torch_boxes = boxes(YOLO(model_path))
+    onnx_boxes = boxes(YOLO(onnx_path, task="detect"))
+
+    ious = []
+    for a, b in zip(torch_boxes, onnx_boxes):
+        if len(a) and len(b):
+            iou = FaceTracker._iou_matrix(a, b)
+            rows, cols = linear_sum_assignment(-iou)
+            ious.extend(iou[rows, cols].tolist())
+    boxes_torch = sum(len(a) for a in torch_boxes)
+    boxes_onnx = sum(len(b) for b in onnx_boxes)
+    mean_iou = float(np.mean(ious)) if ious else float('nan')
+    if boxes_torch == 0 and boxes_onnx == 0:
+        status = "inconclusive"
+    elif boxes_torch == boxes_onnx and mean_iou >= min_iou:
+        status = "pass"
+    else:
+        status = "fail"
+    return {
+        'boxes_torch': float(boxes_torch),
+        'boxes_onnx': float(boxes_onnx),
+        'mean_iou': mean_iou,
+        'status': status,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    """导出ONNX模型并检查与PyTorch输出的一致性"""
+    import argparse
+    from facenet_pytorch import InceptionResnetV1
+
+    parser = argparse.ArgumentParser(description="导出ONNX模型并检查一致性")
+    parser.add_argument("--model", default="yolov8n-face.pt", help="YOLO权重路径")
+    parser.add_argument("--facenet-onnx", default=FACENET_ONNX_PATH, help="FaceNet ONNX输出路径")
+    parser.add_argument("--image", action="append", default=[],
+                        help="用于检测一致性检查的含人脸图片，可重复指定（默认使用 ultralytics 示例图片）")
+    args = parser.parse_args(argv)
+    frames = detector_parity_frames(args.image)
+    if not frames:
+        parser.error(f"无法读取检测一致性检查图片: {args.image}")
+
+    resnet = InceptionResnetV1(pretrained='vggface2').eval()
+    export_facenet_onnx(resnet, args.facenet_onnx)
+    batch = np.random.default_rng(0).uniform(0, 255, (8, 3, 160, 160)).astype(np.float32)
+    parity = check_parity(TorchBackend(resnet), OnnxBackend(args.facenet_onnx), batch)
+    print(f"FaceNet: max|diff| {parity['max_abs_diff']:.2e}, min cosine {parity['min_cosine']:.6f}")
+
+    onnx_path = export_yolo_onnx(args.model)
+    parity = check_detector_parity(args.model, onnx_path, frames)
+    print(f"YOLO: {parity['boxes_torch']:.0f} vs {parity['boxes_onnx']:.0f} boxes, "
+          f"mean IoU {parity['mean_iou']:.4f} ({parity['status']})")
+    if parity['status'] == "inconclusive":
+        print("警告: 图片中没有检测到人脸，无法判断一致性，请用 --image 指定含人脸的图片")
+
+
+if __name__ == "__main__":
+    main()
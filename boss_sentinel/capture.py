@@ -0,0 +1,140 @@
+import time
+import threading
+import numpy as np
+import cv2
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+
+@dataclass
+class FramePacket:
+    """采集到的一帧（带时间戳和序号）"""
+    camera_idx: int
+    frame: np.ndarray
+    timestamp: float
+    seq: int
+
+
+class CameraReader:
+    """摄像头后台读取器 - 单槽最新帧缓冲"""
+
+    def __init__(self, capture: cv2.VideoCapture, camera_idx: int, stale_after: float = 1.0):
+        """
+        初始化读取器
+
+        参数:
+            capture: 已打开的视频采集对象（cv2.VideoCapture 或 sources.FrameSource）
+            camera_idx: 摄像头索引
+            stale_after: 帧的最大有效时长（秒），超过则视为过期帧
+        """
+        self.capture = capture
+        self.camera_idx = camera_idx
+        self.stale_after = stale_after
+        # 非实时来源（fast 模式的视频/图像目录）不丢帧：等上一帧被取走后再读下一帧，也不做过期检查
+        self.realtime = getattr(capture, 'realtime', True)
+
+        self._lock = threading.Lock()
+        self._consumed = threading.Condition(self._lock)
+        self._latest: Optional[FramePacket] = None
+        self._seq = 0
+        self._consumed_seq = 0
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+        # 统计计数
+        self.frames_captured = 0
+        self.frames_dropped = 0  # 未被消费就被新帧覆盖
+        self.frames_stale = 0    # 消费时已过期
+        self.read_failures = 0
+
+    def start(self) -> None:
+        """启动后台读取线程"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name=f"CameraReader-{self.camera_idx}", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        """读取循环：始终只保留最新一帧（非实时来源等待上一帧被取走）"""
+        while self._running:
+            if not self.realtime:
+                with self._consumed:
+                    self._consumed.wait_for(
+                        lambda: not self._running or self._latest is None
+                        or self._latest.seq <= self._consumed_seq
+                    )
+                if not self._running:
+                    break
+
+            ret, frame = self.capture.read()
+            if not ret:
+                if self.finished:
+                    break
+                self.read_failures += 1
+                time.sleep(0.01)
+                continue
+
+            timestamp = time.time()
+            with self._lock:
+                if self._latest is not None and self._latest.seq > self._consumed_seq:
+                    self.frames_dropped += 1
+                self._seq += 1
+                self._latest = FramePacket(self.camera_idx, frame, timestamp, self._seq)
+                self.frames_captured += 1
+
+    def read_latest(self) -> Optional[FramePacket]:
+        """
+        获取最新帧（非阻塞）
+
+        返回:
+            自上次调用以来的新帧；没有新帧或帧已过期时返回None
+        """
+        with self._lock:
+            packet = self._latest
+            if packet is None or packet.seq <= self._consumed_seq:
+                return None
+            self._consumed_seq = packet.seq
+            self._consumed.notify()
+
+        if self.realtime and time.time() - packet.timestamp > self.stale_after:
+            self.frames_stale += 1
+            return None
+
+        return packet
+
+    @property
+    def finished(self) -> bool:
+        """来源是否已读完（仅非循环的视频文件、图像目录和合成画面会结束）"""
+        return getattr(self.capture, 'finished', False)
+
+    @property
+    def drained(self) -> bool:
+        """来源已读完且最后一帧已被取走"""
+        with self._lock:
+            return self.finished and (self._latest is None or self._latest.seq <= self._consumed_seq)
+
+    def stats(self) -> Dict[str, int]:
+        """获取读取统计"""
+        return {
+            'captured': self.frames_captured,
+            'dropped': self.frames_dropped,
+            'stale': self.frames_stale,
+            'read_failures': self.read_failures,
+        }
+
+    def stop(self) -> None:
+        """停止读取线程"""
+        with self._lock:
+            self._running = False
+            self._consumed.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def release(self) -> None:
+        """停止读取并释放采集设备"""
+        self.stop()
+        self.capture.release()
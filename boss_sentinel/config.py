@@ -1,7 +1,7 @@
 import os
 import json
 import time
-from typing import Dict, Any, List, Optional, Callable
+from typing import Dict, Any, List, Optional, Callable, Union
 from dataclasses import dataclass, field
 
 @dataclass
@@ -13,6 +13,10 @@ class EmailConfig:
     smtp_port: int
     username: str
     password: str
+    use_tls: bool = True  # 是否使用STARTTLS
+    timeout: float = 10.0  # SMTP连接超时（秒）
+    coalesce_window: float = 300.0  # 同一人物在该时长（秒）内的重复检测合并为一封邮件
+    max_per_hour: int = 20  # 每小时最多发送的邮件数，0表示不限制
 
 @dataclass
 class SentinelConfig:
@@ -23,12 +27,46 @@ class SentinelConfig:
     threshold: float = 0.7
     confidence_threshold: float = 0.7
     show_feed: bool = True
-    cameras: List[int] = field(default_factory=lambda: [0])
+    cameras: List[Union[int, str]] = field(default_factory=lambda: [0])  # 摄像头索引，或视频文件/图像目录/"synthetic"
     log_file: str = "sentinel_log.txt"
+    log_format: str = "text"  # 日志格式: text 纯文本，json 每行一个JSON对象（含摄像头、人物、相似度、耗时等字段）
+    log_max_bytes: int = 10 * 1024 * 1024  # 日志文件超过该大小（字节）时轮转，0表示不按大小轮转
+    log_rotate_interval: float = 0.0  # 按时间轮转的间隔（小时），0表示不按时间轮转
+    log_backup_count: int = 5  # 保留的历史日志文件数
     notification_email: Optional[EmailConfig] = None
     # 性能优化配置
-    frame_skip: int = 3  # 帧跳过数，每N帧处理一次
+    frame_skip: int = 3  # 帧跳过数，每N帧处理一次（按摄像头计）
+    adaptive_skip: bool = False  # 是否根据延迟目标、CPU预算和画面活动自动调整跳帧数
+    target_latency: float = 0.5  # 自适应模式目标端到端延迟（秒）
+    cpu_budget: float = 0.5  # 自适应模式推理时间占比预算（0-1），所有摄像头平分
+    max_frame_skip: int = 15  # 自适应模式最大跳帧数
+    idle_after: float = 5.0  # 画面无人脸持续多久（秒）后降低处理频率
     use_gpu: bool = True  # 是否使用GPU加速
+    inference_backend: str = "torch"  # 推理后端: torch / onnx（ONNX Runtime CPU）
+    recognizer_precision: str = "fp32"  # 人脸特征提取精度: fp32 / int8_dynamic / int8_static（用人脸库照片校准）
+    detect_size: int = 0  # 检测器输入尺寸（长边像素），0表示模型默认；人脸裁剪仍使用原始分辨率
+    stale_frame_age: float = 1.0  # 帧最大有效时长（秒），超过则丢弃
+    source_pacing: str = "realtime"  # 视频文件/图像目录/合成画面的节流: realtime 按帧率播放，fast 尽快且不丢帧
+    source_fps: float = 25.0  # 图像目录与合成画面的帧率
+    source_loop: bool = False  # 视频文件与图像目录读完后是否循环
+    pipeline: bool = False  # 是否启用多线程流水线（检测与识别重叠执行）
+    pipeline_queue_size: int = 2  # 流水线各阶段队列容量，满时丢弃最旧任务
+    instrumentation: bool = False  # 是否统计各阶段耗时直方图与计数（SentinelMonitor.stats()）
+    worker_processes: int = 0  # 多进程模式的工作进程数（摄像头轮询分组，帧经共享内存传递），0表示单进程
+    metrics_port: int = 0  # 本机指标HTTP端口（Prometheus文本格式，/metrics），0表示关闭
+    reverify_interval: int = 30  # 已识别目标的身份复核间隔（处理帧数），0表示每帧识别
+    reverify_box_change: float = 0.5  # 边界框位移/尺寸变化超过该比例时立即复核
+    max_embeddings_per_frame: int = 0  # 每帧最多提取特征的人脸数，0表示不限制
+    embedding_cache: bool = True  # 是否将人脸库特征缓存到磁盘，加速启动
+    enroll_workers: int = 0  # 人脸库图像解码线程数，0表示自动
+    enroll_batch_size: int = 32  # 人脸库特征提取批大小
+    motion_gate: bool = False  # 是否启用运动门控（画面无变化时跳过人脸检测）
+    motion_threshold: float = 0.01  # 运动门控变化像素占比阈值
+    motion_refresh_interval: float = 5.0  # 运动门控强制检测间隔（秒）
+    tracker_motion_model: str = "none"  # 跟踪运动模型: none / constant_velocity
+    keyframe_interval: int = 1  # 每N个处理帧运行一次检测器，其余帧由跟踪器预测
+    watch_known_faces: bool = True  # 是否监控人脸库目录并增量热更新
+    known_faces_poll_interval: float = 2.0  # 人脸库目录轮询间隔（秒）
 
     def __post_init__(self):
         """配置验证"""
@@ -122,9 +160,43 @@ def load_config(config_dict: Dict[str, Any]) -> SentinelConfig:
         show_feed=config_dict.get('show_feed'),
         cameras=config_dict.get('cameras'),
         log_file=config_dict.get('log_file'),
+        log_format=config_dict.get('log_format', "text"),
+        log_max_bytes=config_dict.get('log_max_bytes', 10 * 1024 * 1024),
+        log_rotate_interval=config_dict.get('log_rotate_interval', 0.0),
+        log_backup_count=config_dict.get('log_backup_count', 5),
         notification_email=email_config,
         frame_skip=config_dict.get('frame_skip', 3),
-        use_gpu=config_dict.get('use_gpu', True)
+        adaptive_skip=config_dict.get('adaptive_skip', False),
+        target_latency=config_dict.get('target_latency', 0.5),
+        cpu_budget=config_dict.get('cpu_budget', 0.5),
+        max_frame_skip=config_dict.get('max_frame_skip', 15),
+        idle_after=config_dict.get('idle_after', 5.0),
+        use_gpu=config_dict.get('use_gpu', True),
+        inference_backend=config_dict.get('inference_backend', "torch"),
+        recognizer_precision=config_dict.get('recognizer_precision', "fp32"),
+        detect_size=config_dict.get('detect_size', 0),
+        stale_frame_age=config_dict.get('stale_frame_age', 1.0),
+        source_pacing=config_dict.get('source_pacing', "realtime"),
+        source_fps=config_dict.get('source_fps', 25.0),
+        source_loop=config_dict.get('source_loop', False),
+        pipeline=config_dict.get('pipeline', False),
+        pipeline_queue_size=config_dict.get('pipeline_queue_size', 2),
+        instrumentation=config_dict.get('instrumentation', False),
+        worker_processes=config_dict.get('worker_processes', 0),
+        metrics_port=config_dict.get('metrics_port', 0),
+        reverify_interval=config_dict.get('reverify_interval', 30),
+        reverify_box_change=config_dict.get('reverify_box_change', 0.5),
+        max_embeddings_per_frame=config_dict.get('max_embeddings_per_frame', 0),
+        embedding_cache=config_dict.get('embedding_cache', True),
+        enroll_workers=config_dict.get('enroll_workers', 0),
+        enroll_batch_size=config_dict.get('enroll_batch_size', 32),
+        motion_gate=config_dict.get('motion_gate', False),
+        motion_threshold=config_dict.get('motion_threshold', 0.01),
+        motion_refresh_interval=config_dict.get('motion_refresh_interval', 5.0),
+        tracker_motion_model=config_dict.get('tracker_motion_model', "none"),
+        keyframe_interval=config_dict.get('keyframe_interval', 1),
+        watch_known_faces=config_dict.get('watch_known_faces', True),
+        known_faces_poll_interval=config_dict.get('known_faces_poll_interval', 2.0)
     )
 
 
@@ -139,8 +211,42 @@ def save_config(config: SentinelConfig, file_path: str) -> None:
         'show_feed': config.show_feed,
         'cameras': config.cameras,
         'log_file': config.log_file,
+        'log_format': config.log_format,
+        'log_max_bytes': config.log_max_bytes,
+        'log_rotate_interval': config.log_rotate_interval,
+        'log_backup_count': config.log_backup_count,
         'frame_skip': config.frame_skip,
-        'use_gpu': config.use_gpu
+        'adaptive_skip': config.adaptive_skip,
+        'target_latency': config.target_latency,
+        'cpu_budget': config.cpu_budget,
+        'max_frame_skip': config.max_frame_skip,
+        'idle_after': config.idle_after,
+        'use_gpu': config.use_gpu,
+        'inference_backend': config.inference_backend,
+        'recognizer_precision': config.recognizer_precision,
+        'detect_size': config.detect_size,
+        'stale_frame_age': config.stale_frame_age,
+        'source_pacing': config.source_pacing,
+        'source_fps': config.source_fps,
+        'source_loop': config.source_loop,
+        'pipeline': config.pipeline,
+        'pipeline_queue_size': config.pipeline_queue_size,
+        'instrumentation': config.instrumentation,
+        'worker_processes': config.worker_processes,
+        'metrics_port': config.metrics_port,
+        'reverify_interval': config.reverify_interval,
+        'reverify_box_change': config.reverify_box_change,
+        'max_embeddings_per_frame': config.max_embeddings_per_frame,
+        'embedding_cache': config.embedding_cache,
+        'enroll_workers': config.enroll_workers,
+        'enroll_batch_size': config.enroll_batch_size,
+        'motion_gate': config.motion_gate,
+        'motion_threshold': config.motion_threshold,
+        'motion_refresh_interval': config.motion_refresh_interval,
+        'tracker_motion_model': config.tracker_motion_model,
+        'keyframe_interval': config.keyframe_interval,
+        'watch_known_faces': config.watch_known_faces,
+        'known_faces_poll_interval': config.known_faces_poll_interval
     }
 
     if config.notification_email:
@@ -150,7 +256,11 @@ def save_config(config: SentinelConfig, file_path: str) -> None:
             'smtp_server': config.notification_email.smtp_server,
             'smtp_port': config.notification_email.smtp_port,
             'username': config.notification_email.username,
-            'password': config.notification_email.password
+            'password': config.notification_email.password,
+            'use_tls': config.notification_email.use_tls,
+            'timeout': config.notification_email.timeout,
+            'coalesce_window': config.notification_email.coalesce_window,
+            'max_per_hour': config.notification_email.max_per_hour
         }
 
     with open(file_path, 'w', encoding='utf-8') as f:
@@ -1,28 +1,79 @@
-from ultralytics import YOLO
 import cv2
-from typing import Optional, List
+from typing import Optional, List, Tuple
+import os
 import numpy as np
-import torch
+from .backends import BACKENDS, yolo_onnx_path, export_yolo_onnx, check_detector_parity, detector_parity_frames
 
 class FaceDetector:
-    """基于YOLOv8的人脸检测器"""
+    """
+    基于YOLOv8的人脸检测器
 
-    def __init__(self, model_path: str = "yolov8n-face.pt", use_gpu: bool = True):
+    ONNX后端没有使用 InferenceBackend 抽象：YOLO的前处理（letterbox）与后处理（解码、NMS）
+    仍由 ultralytics 完成，它以 onnxruntime 执行导出的 .onnx 模型。因此 ultralytics（及其依赖的torch）
+    仍会被导入，但不会加载PyTorch权重，推理也不经过torch。
+    """
+
+    def __init__(self, model_path: str = "yolov8n-face.pt", use_gpu: bool = True, input_size: int = 0,
+                 backend: str = "torch"):
         """
         初始化人脸检测器
 
         参数:
             model_path: YOLOv8模型路径
             use_gpu: 是否使用GPU加速
+            input_size: 检测器输入尺寸（长边像素，32的倍数），0表示使用模型默认尺寸
+            backend: 推理后端，"torch" 或 "onnx"（ONNX Runtime CPU，首次使用时自动导出）
         """
+        if backend not in BACKENDS:
+            raise ValueError(f"未知的推理后端: {backend}")
+        self.backend = backend
+
+        # 检测输入尺寸需为32的倍数
+        self.input_size = max(32, int(round(input_size / 32)) * 32) if input_size else 0
+
+        # ultralytics 导入较慢，延迟到创建检测器时
+        from ultralytics import YOLO
+
+        if backend == "onnx":
+            # ONNX Runtime 后端仅使用CPU
+            self.device = 'cpu'
+            print(f"使用设备: {self.device} ({backend})")
+            onnx_path = model_path if model_path.endswith('.onnx') else yolo_onnx_path(model_path)
+            if not os.path.exists(onnx_path):
+                onnx_path = self._export_onnx(model_path)
+            if onnx_path:
+                self.model = YOLO(onnx_path, task='detect')
+                return
+            self.backend = "torch"
+
         # 检测CUDA是否可用
+        import torch
         self.device = 'cuda:0' if (use_gpu and torch.cuda.is_available()) else 'cpu'
-        print(f"使用设备: {self.device}")
+        print(f"使用设备: {self.device} ({self.backend})")
 
         # 加载模型到指定设备
         self.model = YOLO(model_path)
         self.model.to(self.device)
 
+    @staticmethod
+    def _export_onnx(model_path: str) -> Optional[str]:
+        """
+        首次使用ONNX后端时导出模型并检查与PyTorch的检测框一致性
+
+        返回:
+            ONNX模型路径，不一致或无法判断（示例图片中没有检测到人脸）时删除导出文件并返回None（回退到PyTorch）
+        """
+        onnx_path = export_yolo_onnx(model_path)
+        parity = check_detector_parity(model_path, onnx_path, detector_parity_frames())
+        if parity['status'] == "pass":
+            print(f"YOLO ONNX 导出完成 (检测框 {parity['boxes_onnx']:.0f}, 平均IoU {parity['mean_iou']:.4f})")
+            return onnx_path
+
+        reason = "无法判断一致性（没有检测到人脸）" if parity['status'] == "inconclusive" else "检测结果与PyTorch不一致"
+        print(f"警告: YOLO ONNX {reason} ({parity})，回退到PyTorch后端")
+        os.remove(onnx_path)
+        return None
+
     def detect(self, frame: np.ndarray, confidence_threshold: float = 0.7) -> Optional[List[List[float]]]:
         """
         检测图像中的人脸
@@ -35,18 +86,71 @@ class FaceDetector:
             人脸边界框列表，每个边界框格式为[x1, y1, x2, y2, confidence]
             如果没有检测到人脸则返回None
         """
-        results = self.model(frame, verbose=False)
+        image, scale = self._resize(frame)
+        results = self.model(image, verbose=False, **self._predict_kwargs())
         if not results:
             return None
 
+        return self._parse_boxes(results[0], confidence_threshold, scale)
+
+    def detect_batch(self, frames: List[np.ndarray],
+                     confidence_threshold: float = 0.7) -> List[Optional[List[List[float]]]]:
+        """
+        批量检测多帧图像中的人脸（一次YOLO前向推理）
+
+        参数:
+            frames: 输入图像列表(BGR格式)，通常为各摄像头的当前帧
+            confidence_threshold: 置信度阈值
+
+        返回:
+            与输入一一对应的边界框列表，格式同 detect()
+        """
+        if not frames:
+            return []
+
+        resized = [self._resize(frame) for frame in frames]
+        results = self.model([image for image, _ in resized], verbose=False, **self._predict_kwargs())
+        return [
+            self._parse_boxes(result, confidence_threshold, scale)
+            for result, (_, scale) in zip(results, resized)
+        ]
+
+    def _predict_kwargs(self) -> dict:
+        """YOLO推理参数"""
+        return {'imgsz': self.input_size} if self.input_size else {}
+
+    def _resize(self, frame: np.ndarray) -> Tuple[np.ndarray, float]:
+        """
+        将帧缩小到检测输入尺寸（只缩小一次，不放大）
+
+        返回:
+            (缩小后的图像, 缩放比例)
+        """
+        if not self.input_size:
+            return frame, 1.0
+
+        height, width = frame.shape[:2]
+        scale = self.input_size / max(height, width)
+        if scale >= 1.0:
+            return frame, 1.0
+
+        size = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+        return cv2.resize(frame, size, interpolation=cv2.INTER_AREA), scale
+
+    @staticmethod
+    def _parse_boxes(result, confidence_threshold: float, scale: float = 1.0) -> Optional[List[List[float]]]:
+        """将单张图像的YOLO结果转换为边界框列表（映射回原始分辨率坐标）"""
         boxes = []
-        for box in results[0].boxes:
-            x1, y1, x2, y2, conf, cls = box.data.tolist()[0]
+        for x1, y1, x2, y2, conf, cls in result.boxes.data.tolist():
             if conf >= confidence_threshold:
-                boxes.append([x1, y1, x2, y2, conf])
+                boxes.append([x1 / scale, y1 / scale, x2 / scale, y2 / scale, conf])
 
         return boxes if boxes else None
 
+    def warmup(self, frame_shape: Tuple[int, int] = (480, 640)) -> None:
+        """用空白帧执行一次推理，提前完成CUDA初始化/算子选择，避免首个真实帧延迟过高"""
+        self.detect(np.zeros((*frame_shape, 3), dtype=np.uint8), confidence_threshold=1.0)
+
     def draw_boxes(self, frame: np.ndarray, boxes: List[List[float]], color: tuple = (0, 255, 0), thickness: int = 2) -> np.ndarray:
         """
         在图像上绘制人脸边界框
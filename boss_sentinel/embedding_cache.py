@@ -0,0 +1,167 @@
+import os
+import hashlib
+import tempfile
+import numpy as np
+from typing import Dict, Iterable, Optional, Tuple
+
+
+class EmbeddingCache:
+    """
+    人脸特征向量磁盘缓存
+
+    以图像文件的绝对路径为键，记录文件大小、修改时间和内容哈希。
+    文件未变化时直接复用缓存的特征向量；模型标识不一致时整个缓存失效。
+    """
+
+    def __init__(self, cache_path: str, model_id: str):
+        """
+        初始化缓存
+
+        参数:
+            cache_path: 缓存文件路径(.npz)
+            model_id: 模型标识，模型或预处理变化时应随之改变
+        """
+        self.cache_path = cache_path
+        self.model_id = model_id
+        # 路径 -> (大小, 修改时间ns, sha1, 特征向量)
+        self._entries: Dict[str, Tuple[int, int, str, np.ndarray]] = {}
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    @staticmethod
+    def _file_hash(path: str) -> str:
+        """计算文件内容的SHA1"""
+        sha1 = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha1.update(chunk)
+        return sha1.hexdigest()
+
+    def load(self) -> None:
+        """从磁盘加载缓存，文件损坏或模型不一致时忽略"""
+        self._entries = {}
+        if not os.path.exists(self.cache_path):
+            return
+
+        try:
+            with np.load(self.cache_path, allow_pickle=False) as data:
+                if str(data['model_id']) != self.model_id:
+                    self._dirty = True
+                    return
+                for key, size, mtime, digest, embedding in zip(
+                        data['keys'], data['sizes'], data['mtimes'], data['hashes'], data['embeddings']):
+                    self._entries[str(key)] = (int(size), int(mtime), str(digest), embedding[np.newaxis, :])
+        except Exception as e:
+            print(f"特征缓存读取失败，将重新提取: {e}")
+            self._entries = {}
+            self._dirty = True
+
+    def get(self, path: str) -> Optional[np.ndarray]:
+        """
+        查询图像文件的缓存特征
+
+        返回:
+            文件未变化时返回缓存的特征向量 (1, 512)，否则返回None
+        """
+        key = os.path.abspath(path)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        size, mtime, digest, embedding = entry
+        try:
+            stat = os.stat(path)
+            if stat.st_size == size and stat.st_mtime_ns == mtime:
+                self.hits += 1
+                return embedding
+
+            # 修改时间变化但内容未变（如复制、检出）时仍可复用
+            unchanged = stat.st_size == size and self._file_hash(path) == digest
+        except FileNotFoundError:
+            # 文件在扫描后被删除，按未命中处理，由调用方跳过
+            self.misses += 1
+            return None
+
+        if unchanged:
+            self._entries[key] = (size, stat.st_mtime_ns, digest, embedding)
+            self._dirty = True
+            self.hits += 1
+            return embedding
+
+        self.misses += 1
+        return None
+
+    def put(self, path: str, embedding: np.ndarray) -> bool:
+        """
+        写入图像文件的特征向量
+
+        返回:
+            文件已被删除时返回False（不写入缓存）
+        """
+        try:
+            stat = os.stat(path)
+            digest = self._file_hash(path)
+        except FileNotFoundError:
+            return False
+        self._entries[os.path.abspath(path)] = (
+            stat.st_size, stat.st_mtime_ns, digest,
+            np.asarray(embedding, dtype=np.float32).reshape(1, -1)
+        )
+        self._dirty = True
+        return True
+
+    def remove(self, path: str) -> None:
+        """删除图像文件的缓存"""
+        if self._entries.pop(os.path.abspath(path), None) is not None:
+            self._dirty = True
+
+    def prune(self, keep_paths: Iterable[str]) -> None:
+        """删除已不存在于人脸库中的条目"""
+        keep = {os.path.abspath(path) for path in keep_paths}
+        for key in list(self._entries.keys()):
+            if key not in keep:
+                del self._entries[key]
+                self._dirty = True
+
+    def save(self) -> None:
+        """
+        有变化时原子写回磁盘
+
+        先写入同目录下的唯一临时文件再替换，多个进程（如多进程模式的各工作进程）同时保存时
+        不会互相覆盖临时文件，最终文件总是某一次完整的写入。
+        """
+        if not self._dirty:
+            return
+
+        keys = list(self._entries.keys())
+        entries = [self._entries[key] for key in keys]
+        cache_dir = os.path.dirname(os.path.abspath(self.cache_path))
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(
+                prefix=os.path.basename(self.cache_path) + ".", suffix=".tmp", dir=cache_dir)
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(
+                    f,
+                    model_id=np.array(self.model_id),
+                    keys=np.array(keys, dtype=str),
+                    sizes=np.array([e[0] for e in entries], dtype=np.int64),
+                    mtimes=np.array([e[1] for e in entries], dtype=np.int64),
+                    hashes=np.array([e[2] for e in entries], dtype=str),
+                    embeddings=(np.concatenate([e[3] for e in entries]) if entries
+                                else np.empty((0, 512), dtype=np.float32)),
+                )
+            os.replace(tmp_path, self.cache_path)
+            tmp_path = None
+            self._dirty = False
+        except OSError as e:
+            print(f"特征缓存写入失败: {e}")
+        finally:
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
@@ -7,6 +7,7 @@ from PyQt5.QtCore import QThread, pyqtSignal, Qt
 from PyQt5.QtGui import QIcon, QFont
 from .monitor import SentinelMonitor
 from .config import SentinelConfig
+from .sources import parse_source
 
 
 class SentinelThread(QThread):
@@ -28,15 +29,11 @@ class SentinelThread(QThread):
             self.progress_signal.emit(10, "正在加载配置...")
             self.monitor = SentinelMonitor(self.config, lazy_load=True)
 
-            # 加载模型
-            self.progress_signal.emit(30, "正在加载YOLOv8模型...")
-            self.monitor.initialize_models()
+            # 加载模型（导入、权重加载、人脸库、预热）
+            self.monitor.initialize_models(progress_callback=self.enroll_progress_callback,
+                                           stage_callback=self.stage_callback)
 
-            self.progress_signal.emit(80, "模型加载完成，准备启动监控...")
-            import time
-            time.sleep(0.5)
-
-            self.progress_signal.emit(90, "开始监控...")
+            self.progress_signal.emit(90, "模型加载完成，开始监控...")
             self.status_signal.emit("monitoring")
             self.monitor.run(callback=self.detection_callback)
 
@@ -44,6 +41,25 @@ class SentinelThread(QThread):
             self.error_signal.emit(f"初始化失败: {str(e)}")
             self.status_signal.emit("error")
 
+    # 启动阶段 -> (进度百分比, 消息)
+    STAGES = {
+        'import': (15, "正在导入推理库..."),
+        'detector': (20, "正在加载YOLOv8模型..."),
+        'recognizer': (30, "正在加载人脸识别模型..."),
+        'warmup': (80, "正在预热模型..."),
+        'cameras': (85, "正在打开摄像头..."),
+    }
+
+    def stage_callback(self, stage):
+        """启动阶段回调"""
+        if stage in self.STAGES:
+            self.progress_signal.emit(*self.STAGES[stage])
+
+    def enroll_progress_callback(self, done, total):
+        """人脸库加载进度回调（映射到30%-80%区间）"""
+        if total:
+            self.progress_signal.emit(30 + 50 * done // total, f"正在加载人脸库 ({done}/{total})...")
+
     def detection_callback(self, person_name):
         """检测回调函数"""
         self.detection_signal.emit(f"检测到目标人物: {person_name}")
@@ -78,7 +94,7 @@ class ConfigGroup(QGroupBox):
         layout.addRow("人脸目录:", self.known_faces_dir)
         layout.addRow("日志文件:", self.log_file)
         layout.addRow("检测间隔(秒):", self.detection_interval)
-        layout.addRow("摄像头ID(逗号分隔):", self.cameras)
+        layout.addRow("摄像头ID/视频文件(逗号分隔):", self.cameras)
         layout.addRow("识别阈值:", self.threshold)
         layout.addRow("置信度阈值:", self.confidence_threshold)
         layout.addRow("帧跳过数(性能优化):", self.frame_skip)
@@ -93,7 +109,7 @@ class ConfigGroup(QGroupBox):
             known_faces_dir=self.known_faces_dir.text(),
             log_file=self.log_file.text(),
             detection_interval=int(self.detection_interval.text()),
-            cameras=[int(cam.strip()) for cam in self.cameras.text().split(",") if cam.strip()],
+            cameras=[parse_source(cam) for cam in self.cameras.text().split(",") if cam.strip()],
             threshold=float(self.threshold.text()),
             confidence_threshold=float(self.confidence_threshold.text()),
             frame_skip=int(self.frame_skip.text()),
@@ -297,6 +313,7 @@ class MainWindow(QMainWindow):
             self.status_label.setText("状态: 监控中")
             self.status_label.setStyleSheet("color: green; font-weight: bold;")
             self.update_ui_state("monitoring")
+            self.show_recent_log()
         elif status == "stopped":
             self.status_label.setText("状态: 已停止")
             self.status_label.setStyleSheet("color: gray; font-weight: bold;")
@@ -308,6 +325,16 @@ class MainWindow(QMainWindow):
             self._is_monitoring = False
             self.update_ui_state("error")
 
+    def show_recent_log(self, n: int = 20):
+        """在日志面板显示最近的日志（从内存缓冲或日志文件末尾读取，与日志文件大小无关）"""
+        monitor = self.sentinel_thread.monitor if self.sentinel_thread else None
+        if monitor is None:
+            return
+        entries = monitor.logger.get_last_n_entries(n) or []
+        lines = [entry.rstrip() for entry in entries if entry.strip()]
+        if lines:
+            self.log_display.append("最近日志:\n" + "\n".join(lines))
+
     def update_ui_state(self, state):
         """更新UI状态"""
         if state == "starting" or state == "monitoring":
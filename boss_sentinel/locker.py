@@ -1,5 +1,3 @@
-import win32api
-import win32con
 from typing import NoReturn, Union
 
 class WindowsLocker:
@@ -9,6 +7,10 @@ class WindowsLocker:
     def lock() -> bool:
         """锁定Windows系统"""
         try:
+            # pywin32 仅在Windows上可用，延迟到实际锁屏时导入
+            import win32api
+            import win32con
+
             # 模拟按下Win+L组合键
             win32api.keybd_event(win32con.VK_LWIN, 0, 0, 0)
             win32api.keybd_event(ord('L'), 0, 0, 0)
@@ -23,6 +25,8 @@ class WindowsLocker:
     def is_locked() -> Union[bool, None]:
         """检查系统是否已锁定(需要管理员权限)"""
         try:
+            import win32api
+
             # 尝试获取桌面窗口句柄
             desktop = win32api.GetDesktopWindow()
             return win32api.GetWindowText(desktop) == ""
@@ -1,59 +1,336 @@
 from datetime import datetime
-from typing import Optional
+from collections import deque
+from itertools import islice
+from typing import Any, Deque, Dict, List, Optional
 import os
+import json
+import time
+import queue
+import atexit
+import weakref
+import threading
+
+LOG_FORMATS = ("text", "json")
+
+# 进程退出时写完所有日志记录器队列中的日志（后台线程为守护线程，否则会丢失）
+_LOGGERS: "weakref.WeakSet[SentinelLogger]" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_loggers() -> None:
+    for logger in list(_LOGGERS):
+        logger.close()
+
+
+def tail_lines(path: str, n: int, block_size: int = 8192) -> List[str]:
+    """
+    从文件末尾向前按块读取最后n行，耗时与内存只与n和行长有关，与文件大小无关
+
+    参数:
+        path: 文件路径
+        n: 行数
+        block_size: 每次向前读取的字节数
+
+    返回:
+        行列表(从旧到新，保留换行符)
+    """
+    if n <= 0:
+        return []
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        blocks: List[bytes] = []
+        newlines = 0
+        # 多读一个换行符，保证最前面可能不完整的一行可以丢弃
+        while position > 0 and newlines <= n:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            block = f.read(step)
+            blocks.append(block)
+            newlines += block.count(b'\n')
+
+    data = b''.join(reversed(blocks)).decode('utf-8', errors='replace').replace('\r\n', '\n')
+    lines = data.splitlines(keepends=True)
+    if position > 0:
+        lines = lines[1:]
+    return lines[-n:]
+
 
 class SentinelLogger:
-    """哨兵系统日志记录器"""
-    
-    def __init__(self, log_file: str = "sentinel_log.txt"):
+    """
+    哨兵系统日志记录器
+
+    log() 只把日志条目放入队列，由后台线程批量写入文件并打印到控制台，
+    检测循环不等待磁盘和控制台I/O。支持按大小/时间轮转，以及每行一个JSON对象的结构化格式。
+    """
+
+    ROTATE_RETRY_INTERVAL = 60.0  # 轮转失败后的重试间隔（秒）
+
+    def __init__(self, log_file: str = "sentinel_log.txt", log_format: str = "text",
+                 max_bytes: int = 0, rotate_interval: float = 0.0, backup_count: int = 5,
+                 flush_interval: float = 0.5, queue_size: int = 10000, recent_size: int = 1000):
         """
         初始化日志记录器
-        
+
         参数:
             log_file: 日志文件路径
+            log_format: "text" 为纯文本行，"json" 为 JSON Lines（附带结构化字段）
+            max_bytes: 日志文件超过该大小（字节）时轮转，0表示不按大小轮转
+            rotate_interval: 按时间轮转的间隔（秒），0表示不按时间轮转
+            backup_count: 保留的历史日志文件数（log_file.1 为最新）
+            flush_interval: 后台线程最长刷盘间隔（秒）
+            queue_size: 日志队列容量，满时丢弃新的日志
+            recent_size: 内存中保留的最近日志行数
         """
+        if log_format not in LOG_FORMATS:
+            raise ValueError(f"未知的日志格式: {log_format}")
         self.log_file = log_file
+        self.log_format = log_format
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.backup_count = backup_count
+        self.flush_interval = flush_interval
+        self.dropped = 0
+
+        # 条目为 (记录, 是否打印)、(None, Event)（flush请求）或 None（停止）
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+        self._file = None
+        self._rotatable = False
+        self._size = 0  # 当前日志文件大小（字节）
+        self._next_rollover = 0.0
+        self._rotate_retry_at = 0.0
+        self._last_flush = 0.0
+        self._dirty = False
+        # 最近写入的日志行（环形缓冲），供GUI等读取最近日志时不访问文件
+        self._recent: Deque[str] = deque(maxlen=recent_size)
+        self._recent_lock = threading.Lock()
+        _LOGGERS.add(self)
         self._init_log_file()
-        
+
     def _init_log_file(self):
         """初始化日志文件"""
         log_dir = os.path.dirname(self.log_file)
         if log_dir:  # 只有非空时才创建目录
             os.makedirs(log_dir, exist_ok=True)
-        with open(self.log_file, 'a') as f:
-            f.write(f"\n\n=== 哨兵系统启动 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ===\n")
-            
-    def log(self, message: str, print_console: bool = True):
+        self._enqueue({'time': time.time(), 'event': 'startup', 'message': None}, False)
+
+    def log(self, message: str, print_console: bool = True, **fields):
         """
-        记录日志
-        
+        记录日志（非阻塞）
+
         参数:
             message: 日志消息
             print_console: 是否同时打印到控制台
+            fields: 结构化字段（如 event、camera、person、similarity、latency_ms），仅写入JSON格式
+        """
+        record = {'time': time.time(), 'message': message}
+        record.update(fields)
+        self._enqueue(record, print_console)
+
+    def flush(self, timeout: float = 5.0) -> bool:
         """
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        log_entry = f"[{timestamp}] {message}\n"
-        
-        if print_console:
-            print(log_entry.strip())
-            
-        with open(self.log_file, 'a') as f:
-            f.write(log_entry)
-            
+        等待队列中已有的日志写入文件
+
+        参数:
+            timeout: 最长等待时间（秒），0表示只提交刷盘请求、不等待
+
+        返回:
+            是否在超时前写完
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return self._queue.empty()
+        done = threading.Event()
+        try:
+            self._queue.put((None, done), timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """写完剩余日志后停止后台线程（之后再记录日志会重新启动）"""
+        with self._thread_lock:
+            thread = self._thread
+            if thread is None:
+                return
+            self._queue.put(None)
+            thread.join(timeout)
+            self._thread = None
+
     def get_last_n_entries(self, n: int = 10) -> Optional[list[str]]:
         """
         获取最近的n条日志记录
-        
+
+        不等待后台线程，可在GUI线程中调用。n不超过内存缓冲时直接从缓冲读取（尚在队列中的日志不包含在内）；
+        否则请求后台线程刷盘（不等待完成），从日志文件（及轮转的历史文件）末尾向前读取，
+        不会把整个文件读入内存，最近约 flush_interval 秒内的日志可能尚未写入文件。
+
         参数:
             n: 要获取的日志条目数
-            
+
         返回:
             日志条目列表(从旧到新)或None(如果日志文件不存在)
         """
+        with self._recent_lock:
+            if n <= len(self._recent):
+                return list(islice(reversed(self._recent), n))[::-1]
+
         if not os.path.exists(self.log_file):
             return None
-            
-        with open(self.log_file, 'r') as f:
-            lines = f.readlines()
-            
-        return lines[-n:] if len(lines) >= n else lines
\ No newline at end of file
+        self.flush(timeout=0)
+
+        lines: List[str] = []
+        paths = [self.log_file] + [f"{self.log_file}.{i}" for i in range(1, self.backup_count + 1)]
+        for path in paths:
+            if len(lines) >= n or not os.path.isfile(path):
+                break
+            lines = tail_lines(path, n - len(lines)) + lines
+        return lines
+
+    def _enqueue(self, record: Dict[str, Any], print_console: bool) -> None:
+        if self._thread is None:
+            with self._thread_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="SentinelLogger", daemon=True)
+                    self._thread.start()
+        try:
+            self._queue.put_nowait((record, print_console))
+        except queue.Full:
+            self.dropped += 1
+
+    def format(self, record: Dict[str, Any]) -> str:
+        """将日志条目格式化为一行文本（含换行符）"""
+        timestamp = datetime.fromtimestamp(record['time'])
+        if self.log_format == "json":
+            data = dict(record)
+            data['time'] = timestamp.isoformat(timespec='milliseconds')
+            if data.get('message') is None:
+                data['message'] = "哨兵系统启动"
+            return json.dumps(data, ensure_ascii=False, default=str) + "\n"
+        if record.get('event') == 'startup':
+            return f"\n\n=== 哨兵系统启动 {timestamp.strftime('%Y-%m-%d %H:%M:%S')} ===\n"
+        return f"[{timestamp.strftime('%Y-%m-%d %H:%M:%S')}] {record['message']}\n"
+
+    # ---- 后台线程 ----
+
+    def _open(self):
+        self._file = open(self.log_file, 'a', encoding='utf-8')
+        # 只轮转普通文件（如 os.devnull 不轮转）；文件大小自行累计，
+        # 不调用 tell()（文本文件的 tell() 会先刷新缓冲，使批量写入退化为逐行写入）
+        self._rotatable = self.log_file != os.devnull and os.path.isfile(self.log_file)
+        self._size = os.path.getsize(self.log_file) if self._rotatable else 0
+        if self.rotate_interval > 0:
+            self._next_rollover = time.time() + self.rotate_interval
+
+    @staticmethod
+    def _encoded_size(line: str) -> int:
+        """写入文件后的字节数（Windows文本模式下换行符为两个字节）"""
+        size = len(line.encode('utf-8'))
+        return size + line.count('\n') if os.linesep == '\r\n' else size
+
+    def _should_rotate(self, pending: int) -> bool:
+        if not self._rotatable or time.time() < self._rotate_retry_at:
+            return False
+        if self.max_bytes > 0 and self._size > 0 and self._size + pending > self.max_bytes:
+            return True
+        return self.rotate_interval > 0 and time.time() >= self._next_rollover
+
+    def _rotate(self) -> None:
+        """
+        log_file -> log_file.1 -> ... -> log_file.{backup_count}，超出的删除
+
+        重命名失败时（如Windows上文件被其他进程占用）继续写入原文件，一段时间后再重试。
+        """
+        self._file.close()
+        try:
+            if self.backup_count > 0:
+                for i in range(self.backup_count - 1, 0, -1):
+                    source = f"{self.log_file}.{i}"
+                    if os.path.exists(source):
+                        os.replace(source, f"{self.log_file}.{i + 1}")
+                os.replace(self.log_file, f"{self.log_file}.1")
+            else:
+                open(self.log_file, 'w').close()
+        except OSError as e:
+            self._rotate_retry_at = time.time() + self.ROTATE_RETRY_INTERVAL
+            print(f"日志轮转失败: {e}")
+        finally:
+            self._open()
+
+    def _write(self, lines: List[str]) -> None:
+        """写入一批日志（不立即刷盘），需要时在条目之间轮转"""
+        if self._file is None or self._file.closed:
+            self._open()
+        for line in lines:
+            size = self._encoded_size(line)
+            if self._should_rotate(size):
+                self._rotate()
+            self._file.write(line)
+            self._size += size
+
+    def _process(self, batch: List[Any]) -> bool:
+        """
+        处理一批队列条目
+
+        返回:
+            是否收到停止请求
+        """
+        lines: List[str] = []
+        waiters: List[threading.Event] = []
+        stop = False
+        try:
+            for item in batch:
+                if item is None:
+                    stop = True
+                elif isinstance(item[1], threading.Event):
+                    waiters.append(item[1])
+                else:
+                    record, print_console = item
+                    line = self.format(record)
+                    lines.append(line)
+                    if print_console:
+                        print(line.strip())
+            if lines:
+                with self._recent_lock:
+                    for line in lines:
+                        self._recent.extend(line.splitlines(keepends=True))
+                self._write(lines)
+                self._dirty = True
+
+            if self._dirty and (waiters or stop or time.time() - self._last_flush >= self.flush_interval):
+                self._file.flush()
+                self._last_flush, self._dirty = time.time(), False
+        except Exception as e:
+            # 写入失败只丢弃本批日志，后台线程继续运行
+            print(f"写入日志失败: {e}")
+        finally:
+            for waiter in waiters:
+                waiter.set()
+        return stop
+
+    def _run(self) -> None:
+        """后台写入线程：取出队列中已有的全部条目一次写入，最多每 flush_interval 秒刷盘一次"""
+        self._last_flush = time.time()
+        self._dirty = False
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=self.flush_interval if self._dirty else None)
+                except queue.Empty:
+                    self._process([])
+                    continue
+
+                batch = [item]
+                while len(batch) < 1000:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if self._process(batch):
+                    break
+        finally:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
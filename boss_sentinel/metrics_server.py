@@ -0,0 +1,188 @@
+"""
+本地指标HTTP端点
+
+以 Prometheus 文本格式暴露监控系统的吞吐量、阶段耗时、队列深度、人脸库规模和模型加载耗时。
+服务运行在独立线程中，只读取各组件的统计快照，抓取不会阻塞帧处理。
+
+    curl http://127.0.0.1:9108/metrics
+"""
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from .monitor import SentinelMonitor
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _labels(**labels) -> str:
+    """格式化标签，-1 号摄像头（跨摄像头的统计）记为 all"""
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels.items():
+        if key == "camera" and value == -1:
+            value = "all"
+        text = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{key}="{text}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _number(value: float) -> str:
+    if isinstance(value, float) and math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _MetricWriter:
+    """按指标分组输出 HELP/TYPE 与样本"""
+
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def metric(self, name: str, kind: str, help_text: str, samples: List) -> None:
+        """
+        参数:
+            samples: [(标签dict, 值), ...]，为空时不输出该指标
+        """
+        if not samples:
+            return
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            self.lines.append(f"{name}{_labels(**labels)} {_number(value)}")
+
+    def text(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def render_metrics(monitor: "SentinelMonitor") -> str:
+    """生成 Prometheus 文本格式的指标"""
+    out = _MetricWriter()
+    collector = monitor.stats_collector
+
+    out.metric("sentinel_up", "gauge", "Whether the monitor loop is running.",
+               [({}, 1 if monitor.running else 0)])
+
+    # 吞吐量
+    rates = monitor.processing_rates()
+    out.metric("sentinel_processed_fps", "gauge", "Frames processed per second.",
+               [({'camera': idx}, rate['fps']) for idx, rate in sorted(rates.items())])
+    out.metric("sentinel_frame_skip", "gauge", "Current frame skip.",
+               [({'camera': idx}, rate['skip']) for idx, rate in sorted(rates.items())])
+    out.metric("sentinel_frame_cost_seconds", "gauge", "Smoothed processing cost per frame.",
+               [({'camera': idx}, rate['cost_ms'] / 1000) for idx, rate in sorted(rates.items())])
+    out.metric("sentinel_scheduler_frames_total", "counter", "Frames seen by the scheduler.",
+               [({'camera': idx, 'result': result}, rate[result])
+                for idx, rate in sorted(rates.items()) for result in ("processed", "skipped")])
+
+    cameras = list(monitor.cameras)
+    out.metric("sentinel_camera_frames_total", "counter", "Frames read from each source.",
+               [({'camera': reader.camera_idx, 'state': state}, reader.stats()[state])
+                for reader in cameras for state in ("captured", "dropped", "stale", "read_failures")])
+
+    # 热路径计数与阶段耗时（需开启 instrumentation）
+    counters: Dict[str, List] = {}
+    for (name, camera_idx), value in sorted(collector.counters().items()):
+        counters.setdefault(name, []).append(({'camera': camera_idx}, value))
+    for name, samples in counters.items():
+        out.metric(f"sentinel_{name}_total", "counter", f"Hot-path counter {name}.", samples)
+
+    histograms = collector.histograms()
+    if histograms:
+        name = "sentinel_stage_latency_seconds"
+        out.lines.append(f"# HELP {name} Per-stage latency.")
+        out.lines.append(f"# TYPE {name} histogram")
+        for (stage, camera_idx), histogram in sorted(histograms.items()):
+            for bound, count in histogram.cumulative_counts():
+                out.lines.append(f"{name}_bucket{_labels(stage=stage, camera=camera_idx, le=_number(bound))} {count}")
+            out.lines.append(f"{name}_sum{_labels(stage=stage, camera=camera_idx)} {_number(histogram.sum)}")
+            out.lines.append(f"{name}_count{_labels(stage=stage, camera=camera_idx)} {histogram.count}")
+
+    # 流水线队列
+    pipeline = monitor.pipeline
+    if pipeline is not None:
+        out.metric("sentinel_pipeline_queue_depth", "gauge", "Jobs waiting in each pipeline queue.",
+                   [({'stage': stage}, depth) for stage, depth in pipeline.queue_depths().items()])
+        out.metric("sentinel_pipeline_dropped_total", "counter", "Jobs dropped by pipeline backpressure.",
+                   [({'stage': stage}, dropped) for stage, dropped in pipeline.dropped_counts().items()])
+
+    out.metric("sentinel_motion_gate_skip_ratio", "gauge", "Share of frames skipped by the motion gate.",
+               [({'camera': idx}, gate['skip_rate']) for idx, gate in sorted(monitor.motion_gate_stats().items())])
+
+    # 人脸库与模型加载
+    recognizer = monitor.recognizer
+    if recognizer is not None:
+        out.metric("sentinel_gallery_people", "gauge", "People in the face gallery.",
+                   [({}, len(recognizer.known_embeddings))])
+        if recognizer.load_stats:
+            out.metric("sentinel_gallery_images", "gauge", "Images in the face gallery.",
+                       [({}, recognizer.load_stats.get('images', 0))])
+    out.metric("sentinel_startup_seconds", "gauge", "Startup time by phase.",
+               [({'phase': phase}, seconds) for phase, seconds in list(monitor.startup_timings.items())])
+
+    return out.text()
+
+
+class MetricsServer:
+    """在后台线程中运行的指标HTTP服务（默认只监听本机）"""
+
+    def __init__(self, monitor: "SentinelMonitor", port: int, host: str = "127.0.0.1"):
+        """
+        参数:
+            monitor: 监控系统
+            port: 监听端口，0表示由系统分配
+            host: 监听地址
+        """
+        self.monitor = monitor
+        self.host = host
+        self.port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _handler(self):
+        monitor = self.monitor
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                try:
+                    body = render_metrics(monitor).encode("utf-8")
+                except Exception as e:
+                    self.send_error(500, str(e))
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # 不把每次抓取写到控制台
+
+        return Handler
+
+    def start(self) -> None:
+        """启动服务"""
+        if self._server is not None:
+            return
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="MetricsServer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止服务"""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
@@ -1,20 +1,32 @@
 import cv2
 import time
+import importlib
+import threading
 import numpy as np
-from typing import List, Optional, Callable
+from typing import Dict, List, Optional, Callable, Tuple, Union
 from .detector import FaceDetector
-from .recognizer import FaceRecognizer
-from .notifier import EmailNotifier, create_detection_notification
+from .recognizer import FaceRecognizer, KnownFacesWatcher
+from .notifier import EmailNotifier
 from .locker import WindowsLocker
 from .logger import SentinelLogger
 from .config import SentinelConfig, ConfigWatcher
 from .tracker import FaceTracker
+from .capture import CameraReader, FramePacket
+from .sources import open_source
+from .pipeline import InferencePipeline
+from .scheduler import FrameScheduler
+from .motion import MotionGate
+from .workers import WorkerPool
+from .stats import StatsCollector
+from .metrics_server import MetricsServer
 
 
 class SentinelMonitor:
     """哨兵监控系统 - 统一入口"""
 
-    def __init__(self, config: SentinelConfig, lazy_load: bool = False, config_path: Optional[str] = None):
+    def __init__(self, config: SentinelConfig, lazy_load: bool = False, config_path: Optional[str] = None,
+                 detector: Optional[FaceDetector] = None, recognizer: Optional[FaceRecognizer] = None,
+                 worker_models: Optional[Callable[[], Tuple[FaceDetector, FaceRecognizer]]] = None):
         """
         初始化监控系统
 
@@ -22,21 +34,39 @@ class SentinelMonitor:
             config: 系统配置
             lazy_load: 是否延迟加载模型
             config_path: 配置文件路径（启用热重载）
+            detector: 外部注入的检测器（如基准测试中的桩模型），None表示按配置加载
+            recognizer: 外部注入的识别器，None表示按配置加载
+            worker_models: 多进程模式下各工作进程创建 (检测器, 识别器) 的函数（需可pickle），None表示按配置加载
         """
         self.config = config
-        self.logger = SentinelLogger(config.log_file)
+        self.logger = SentinelLogger(
+            config.log_file,
+            log_format=config.log_format,
+            max_bytes=config.log_max_bytes,
+            rotate_interval=config.log_rotate_interval * 3600,
+            backup_count=config.log_backup_count,
+        )
         self.locker = WindowsLocker()
         self.notifier = EmailNotifier(config.notification_email) if config.notification_email else None
         self.running = False
         self.frame_count = 0
-        self.tracker = FaceTracker(max_disappeared=30)
+        self.scheduler = self._create_scheduler(config)
+        self.stats_collector = StatsCollector(enabled=config.instrumentation)
+        self.trackers: Dict[int, FaceTracker] = {}  # 每个摄像头独立跟踪
+        self.motion_gates: Dict[int, MotionGate] = {}  # 每个摄像头独立的运动门控
         self._callback: Optional[Callable[[str], None]] = None
+        self.pipeline: Optional[InferencePipeline] = None
+        self.metrics_server: Optional[MetricsServer] = None
 
         # 模型占位符（懒加载）
         self._models_loaded = False
-        self.detector: Optional[FaceDetector] = None
-        self.recognizer: Optional[FaceRecognizer] = None
-        self.cameras: List[cv2.VideoCapture] = []
+        self.detector: Optional[FaceDetector] = detector
+        self.recognizer: Optional[FaceRecognizer] = recognizer
+        self.worker_models = worker_models
+        self.cameras: List[CameraReader] = []
+        self._faces_watcher: Optional[KnownFacesWatcher] = None
+        # 启动耗时分解（秒）: 导入、权重加载、人脸库、首次推理、摄像头
+        self.startup_timings: Dict[str, float] = {}
 
         # 配置热重载
         self._config_watcher: Optional[ConfigWatcher] = None
@@ -52,49 +82,431 @@ class SentinelMonitor:
         old_faces_dir = self.config.known_faces_dir
         self.config = new_config
 
-        # 更新通知器
+        self.scheduler = self._create_scheduler(new_config)
+        self.stats_collector.enabled = new_config.instrumentation
+
+        # 更新通知器（旧通知器在后台发送完合并中的检测后退出）
+        if self.notifier:
+            self.notifier.close(timeout=0)
         if new_config.notification_email:
             self.notifier = EmailNotifier(new_config.notification_email)
         else:
             self.notifier = None
 
-        # 重新加载人脸特征（如果目录变化）
+        # 重新加载人脸特征（如果目录变化），复用已加载的模型
         if self.recognizer and old_faces_dir != new_config.known_faces_dir:
-            self.recognizer = FaceRecognizer(new_config.known_faces_dir)
-            count = len(self.recognizer.known_embeddings)
-            self.logger.log(f"Reloaded {count} face features")
+            if self._faces_watcher:
+                # 在监控线程中后台加载，不阻塞检测循环
+                self._faces_watcher.change_directory(new_config.known_faces_dir)
+            else:
+                self.recognizer.reload(new_config.known_faces_dir)
+                count = len(self.recognizer.known_embeddings)
+                self.logger.log(f"Reloaded {count} face features")
+                self._log_gallery_stats()
 
         self.logger.log("Config hot-reload complete")
 
-    def initialize_models(self):
-        """初始化模型（支持延迟加载）"""
+    def _create_recognizer(self, progress_callback: Optional[Callable[[int, int], None]] = None) -> FaceRecognizer:
+        """按当前配置创建人脸识别器"""
+        return FaceRecognizer(
+            self.config.known_faces_dir,
+            use_cache=self.config.embedding_cache,
+            progress_callback=progress_callback,
+            workers=self.config.enroll_workers,
+            batch_size=self.config.enroll_batch_size,
+            backend=self.config.inference_backend,
+            precision=self.config.recognizer_precision,
+        )
+
+    def initialize_models(self, progress_callback: Optional[Callable[[int, int], None]] = None,
+                          stage_callback: Optional[Callable[[str], None]] = None):
+        """
+        初始化模型（支持延迟加载）
+
+        首次推理预热在后台线程中与摄像头打开并行进行。
+
+        参数:
+            progress_callback: 人脸库加载进度回调 (已完成数, 总数)
+            stage_callback: 启动阶段回调，依次为 "import"、"detector"、"recognizer"、"warmup"、"cameras"
+        """
         if self._models_loaded:
             return
 
+        def stage(name: str) -> None:
+            if stage_callback:
+                stage_callback(name)
+
         self.logger.log("Loading models...")
-        self.detector = FaceDetector(self.config.model_path, self.config.use_gpu)
-        self.recognizer = FaceRecognizer(self.config.known_faces_dir)
+        timings: Dict[str, float] = {}
+        total_start = time.perf_counter()
+
+        # 多进程模式下模型由各工作进程加载，本进程只负责采集与调度
+        warmup_thread = None
+        if self.config.worker_processes <= 0:
+            warmup_thread = self._load_models(timings, stage, progress_callback)
+
+        stage("cameras")
+        start = time.perf_counter()
         self.cameras = self._init_cameras(self.config.cameras)
+        timings['cameras'] = time.perf_counter() - start
+        if warmup_thread:
+            warmup_thread.join()
+
+        timings['total'] = time.perf_counter() - total_start
+        self.startup_timings = timings
         self._models_loaded = True
         self.logger.log("Models loaded")
+        self.logger.log("Startup timings: " + ", ".join(f"{name} {value:.2f}s" for name, value in timings.items()))
+
+    def _load_models(self, timings: Dict[str, float], stage: Callable[[str], None],
+                     progress_callback: Optional[Callable[[int, int], None]] = None) -> threading.Thread:
+        """
+        导入推理库、加载检测与识别模型（已注入的跳过），并启动后台预热
+
+        返回:
+            预热线程（已启动）
+        """
+        stage("import")
+        start = time.perf_counter()
+        if self.detector is None:
+            importlib.import_module("ultralytics")
+        if self.recognizer is None and FaceRecognizer.requires_torch(self.config.inference_backend):
+            importlib.import_module("facenet_pytorch")
+        timings['import'] = time.perf_counter() - start
+
+        stage("detector")
+        start = time.perf_counter()
+        if self.detector is None:
+            self.detector = FaceDetector(
+                self.config.model_path, self.config.use_gpu, self.config.detect_size, self.config.inference_backend
+            )
+        timings['detector_load'] = time.perf_counter() - start
+
+        stage("recognizer")
+        start = time.perf_counter()
+        if self.recognizer is None:
+            self.recognizer = self._create_recognizer(progress_callback)
+        gallery = self.recognizer.load_stats.get('elapsed', 0.0)
+        timings['recognizer_load'] = time.perf_counter() - start - gallery
+        timings['gallery'] = gallery
+        self._log_gallery_stats()
+
+        stage("warmup")
+        warmup_thread = threading.Thread(target=self._warmup, args=(timings,), daemon=True)
+        warmup_thread.start()
+
+        if self.config.watch_known_faces:
+            self._faces_watcher = KnownFacesWatcher(
+                self.recognizer, self.config.known_faces_poll_interval, on_update=self._on_gallery_updated
+            )
+            self._faces_watcher.start()
+        return warmup_thread
+
+    def _warmup(self, timings: Dict[str, float]) -> None:
+        """首次推理预热（检测器与识别器各一次），耗时记入 timings['warmup']"""
+        start = time.perf_counter()
+        try:
+            self.detector.warmup()
+            self.recognizer.warmup()
+        except Exception as e:
+            self.logger.log(f"Warning: model warm-up failed: {e}", print_console=True)
+        timings['warmup'] = time.perf_counter() - start
+
+    def _log_gallery_stats(self):
+        """记录人脸库加载耗时（区分冷启动与缓存热启动）"""
+        stats = self.recognizer.load_stats
+        if not stats:
+            return
+        mode = "warm" if stats['embedded'] == 0 and stats['cached'] > 0 else "cold"
+        self.logger.log(
+            f"Face gallery loaded in {stats['elapsed']:.2f}s ({mode} start: "
+            f"{stats['cached']} cached, {stats['embedded']} embedded)"
+        )
+
+    def _on_gallery_updated(self, result: Dict[str, int]) -> None:
+        """人脸库增量更新回调"""
+        self.logger.log(
+            f"Face gallery updated: {result['embedded']} embedded, "
+            f"{result['removed']} removed, {result['people']} people"
+        )
 
     def ensure_models_loaded(self):
         """确保模型已加载"""
         if not self._models_loaded:
             self.initialize_models()
 
-    def _init_cameras(self, camera_indices: List[int]) -> List[cv2.VideoCapture]:
-        """初始化摄像头"""
+    def _init_cameras(self, sources: List[Union[int, str]]) -> List[CameraReader]:
+        """初始化摄像头或其他帧来源（每个来源一个后台读取线程）"""
         cameras = []
-        for idx in camera_indices:
-            cap = cv2.VideoCapture(idx)
+        for spec in sources:
+            try:
+                cap = open_source(spec, self.config.source_pacing, self.config.source_fps, self.config.source_loop)
+            except ValueError as e:
+                self.logger.log(f"Warning: Cannot open source {spec}: {e}", print_console=True)
+                continue
             if cap.isOpened():
-                cameras.append(cap)
-                self.logger.log(f"Camera {idx} initialized")
+                reader = CameraReader(cap, len(cameras), stale_after=self.config.stale_frame_age)
+                reader.start()
+                cameras.append(reader)
+                self.logger.log(f"Camera {spec} initialized")
             else:
-                self.logger.log(f"Warning: Cannot open camera {idx}", print_console=True)
+                self.logger.log(f"Warning: Cannot open camera {spec}", print_console=True)
         return cameras
 
+    def _sources_drained(self) -> bool:
+        """所有帧来源都已读完（仅离线来源会结束）"""
+        return bool(self.cameras) and all(reader.drained for reader in self.cameras)
+
+    @staticmethod
+    def _create_scheduler(config: SentinelConfig) -> FrameScheduler:
+        """按配置创建帧调度器"""
+        return FrameScheduler(
+            frame_skip=config.frame_skip,
+            adaptive=config.adaptive_skip,
+            target_latency=config.target_latency,
+            cpu_budget=config.cpu_budget,
+            max_skip=config.max_frame_skip,
+            idle_after=config.idle_after,
+        )
+
+    def _should_process(self, camera_idx: int) -> bool:
+        """帧跳过逻辑：由调度器按摄像头决定是否处理当前帧"""
+        self.frame_count += 1
+        selected = self.scheduler.should_process(camera_idx)
+        self.stats_collector.count("frames_seen", camera_idx)
+        if not selected:
+            self.stats_collector.count("frames_skipped", camera_idx)
+        return selected
+
+    def _record_processing(self, camera_idx: int, elapsed: float) -> None:
+        """向调度器反馈处理耗时与画面活动"""
+        tracker = self.trackers.get(camera_idx)
+        self.scheduler.record(camera_idx, elapsed, len(tracker.tracks) if tracker else 0)
+
+    def processing_rates(self) -> Dict[int, Dict[str, float]]:
+        """获取各摄像头当前的处理速率（跳帧数、处理帧率、单帧耗时）"""
+        return self.scheduler.rates()
+
+    def stats(self) -> Dict[str, object]:
+        """
+        获取热路径统计（需开启 instrumentation 配置）
+
+        返回:
+            {'enabled': .., 'uptime': 秒, 'cameras': {camera_idx: {'counters': {..}, 'latency': {阶段: 摘要}}}}
+            阶段包括 capture/detect/crop/preprocess/embed/match/lock，摘要为 count/mean/p50/p95/p99/max（毫秒）；
+            多进程模式下检测与识别在工作进程中进行，这里只包含采集、跳帧与锁屏统计
+        """
+        return self.stats_collector.snapshot()
+
+    def _record_capture(self, packets: List[FramePacket]) -> None:
+        """记录帧从采集到开始处理的等待时间"""
+        if not self.stats_collector.enabled:
+            return
+        now = time.time()
+        for packet in packets:
+            self.stats_collector.record("capture", packet.camera_idx, now - packet.timestamp)
+
+    def _frame_done(self, camera_idx: int, seq: int) -> None:
+        """
+        流水线/多进程模式下一帧离开处理流程（命中、未命中或处理失败）时调用
+
+        默认不做任何事，供子类（如基准测试）统计帧的决策延迟。
+        """
+
+    def _lock_screen(self) -> None:
+        """锁屏并记录耗时"""
+        start = time.perf_counter()
+        with self.stats_collector.time("lock", -1):
+            self.locker.lock()
+        self.logger.log("Screen locked", print_console=False, event="lock",
+                        latency_ms=round((time.perf_counter() - start) * 1000, 2))
+
+    def _get_tracker(self, camera_idx: int) -> FaceTracker:
+        """获取摄像头对应的跟踪器"""
+        tracker = self.trackers.get(camera_idx)
+        if tracker is None:
+            tracker = FaceTracker(max_disappeared=30, motion_model=self.config.tracker_motion_model)
+            self.trackers[camera_idx] = tracker
+        return tracker
+
+    def _is_keyframe(self, camera_idx: int) -> bool:
+        """当前帧是否需要运行检测器（非关键帧只做运动预测）"""
+        return self._get_tracker(camera_idx).frame_index % max(1, self.config.keyframe_interval) == 0
+
+    def _needs_detection(self, frame: np.ndarray, camera_idx: int) -> bool:
+        """
+        关键帧且通过运动门控时才运行检测器
+
+        画面中已有跟踪目标时跳过门控，避免静止的人脸因无运动而丢失。
+        """
+        if not self._is_keyframe(camera_idx):
+            return False
+        if not self.config.motion_gate or self._get_tracker(camera_idx).tracks:
+            return True
+
+        gate = self.motion_gates.get(camera_idx)
+        if gate is None:
+            gate = MotionGate(self.config.motion_threshold, self.config.motion_refresh_interval)
+            self.motion_gates[camera_idx] = gate
+        return gate.check(frame)
+
+    def motion_gate_stats(self) -> Dict[int, Dict[str, float]]:
+        """获取各摄像头运动门控的放行/跳过统计（可在其他线程中调用，检测线程会新增门控）"""
+        return {camera_idx: gate.stats() for camera_idx, gate in list(self.motion_gates.items())}
+
+    def _faces_to_verify(self, tracker: FaceTracker) -> List[Tuple[int, Tuple[float, float, float, float]]]:
+        """已识别的目标复用缓存结果，只返回需要（重新）识别的跟踪对象快照"""
+        tracks = tracker.tracks_to_verify(
+            self.config.reverify_interval,
+            self.config.reverify_box_change,
+            self.config.max_embeddings_per_frame,
+        )
+        return [(track.track_id, track.bbox) for track in tracks]
+
+    def _update_tracks(self, boxes: Optional[List[List[float]]],
+                       camera_idx: int) -> List[Tuple[int, Tuple[float, float, float, float]]]:
+        """
+        用检测结果更新跟踪器
+
+        返回:
+            需要识别身份的跟踪对象快照列表 [(track_id, bbox), ...]
+        """
+        tracker = self._get_tracker(camera_idx)
+        if not boxes:
+            tracker.update([])
+            return []
+
+        tracker.update(boxes)
+        return self._faces_to_verify(tracker)
+
+    def _predict_tracks(self, camera_idx: int) -> List[Tuple[int, Tuple[float, float, float, float]]]:
+        """非关键帧：按运动模型外推跟踪框，返回需要（重新）识别的跟踪对象快照"""
+        tracker = self._get_tracker(camera_idx)
+        tracker.predict()
+        return self._faces_to_verify(tracker)
+
+    def _detect_faces(self, frame: np.ndarray,
+                      camera_idx: int) -> List[Tuple[int, Tuple[float, float, float, float]]]:
+        """检测人脸（仅关键帧且画面有变化时）并更新跟踪器"""
+        if not self._needs_detection(frame, camera_idx):
+            return self._predict_tracks(camera_idx)
+
+        with self.stats_collector.time("detect", camera_idx):
+            boxes = self.detector.detect(frame, self.config.confidence_threshold)
+        self.stats_collector.count("frames_detected", camera_idx)
+        return self._update_tracks(boxes, camera_idx)
+
+    def _crop_faces(self, frame: np.ndarray, faces: List[Tuple[int, Tuple[float, float, float, float]]],
+                    camera_idx: int = -1) -> List[Tuple[int, np.ndarray]]:
+        """按跟踪框裁剪人脸"""
+        if faces:
+            with self.stats_collector.time("crop", camera_idx):
+                return self._crop_boxes(frame, faces)
+        return []
+
+    @staticmethod
+    def _crop_boxes(frame: np.ndarray,
+                    faces: List[Tuple[int, Tuple[float, float, float, float]]]) -> List[Tuple[int, np.ndarray]]:
+        """裁剪边界框内的图像"""
+        crops = []
+        height, width = frame.shape[:2]
+        for track_id, (x1, y1, x2, y2) in faces:
+            # 预测框可能超出画面，裁剪前先限制到图像范围内
+            x1, x2 = max(0, int(x1)), min(width, int(x2))
+            y1, y2 = max(0, int(y1)), min(height, int(y2))
+            face_img = frame[y1:y2, x1:x2]
+            if face_img.size > 0:
+                crops.append((track_id, face_img))
+        return crops
+
+    def _embed_crops(self, crops: List[Tuple[int, np.ndarray]],
+                     owners: List[int]) -> List[Tuple[int, np.ndarray]]:
+        """
+        所有人脸裁剪图合并为一个批次提取特征向量
+
+        参数:
+            crops: [(track_id, 人脸图像), ...]
+            owners: 每张裁剪图所属的摄像头（用于按摄像头平摊统计耗时）
+        """
+        if not crops:
+            return []
+
+        try:
+            start = time.perf_counter()
+            batch = self.recognizer.preprocess_faces([face_img for _, face_img in crops])
+            preprocessed = time.perf_counter()
+            embeddings = self.recognizer.embed_preprocessed(batch)
+            self.stats_collector.record_shared("preprocess", owners, preprocessed - start)
+            self.stats_collector.record_shared("embed", owners, time.perf_counter() - preprocessed)
+        except Exception as e:
+            self.logger.log(f"Face processing error: {e}")
+            return []
+
+        for camera_idx in owners:
+            self.stats_collector.count("faces_embedded", camera_idx)
+
+        return [(track_id, embeddings[i:i + 1]) for i, (track_id, _) in enumerate(crops)]
+
+    def _embed_faces(self, frame: np.ndarray, faces: List[Tuple[int, Tuple[float, float, float, float]]],
+                     camera_idx: int = -1) -> List[Tuple[int, np.ndarray]]:
+        """裁剪人脸并提取特征向量"""
+        crops = self._crop_faces(frame, faces, camera_idx)
+        return self._embed_crops(crops, [camera_idx] * len(crops))
+
+    def _identify_faces(self, embeddings: List[Tuple[int, np.ndarray]],
+                        camera_idx: int) -> List[Tuple[int, Optional[str], float]]:
+        """
+        与已知人脸比对
+
+        返回:
+            [(track_id, 人物名称或None, 相似度), ...]，比对失败时为空列表
+        """
+        if not embeddings:
+            return []
+
+        try:
+            with self.stats_collector.time("match", camera_idx):
+                matches = self.recognizer.compare_faces_batch(
+                    np.concatenate([embedding for _, embedding in embeddings]), self.config.threshold
+                )
+        except Exception as e:
+            self.logger.log(f"Face processing error: {e}")
+            return []
+
+        return [(track_id, person_name, similarity)
+                for (track_id, _), (person_name, similarity) in zip(embeddings, matches)]
+
+    def _report_matches(self, identities: List[Tuple[int, Optional[str], float]], camera_idx: int) -> bool:
+        """命中目标人物时记录日志并发送通知，返回是否命中"""
+        detected = False
+        for _, person_name, similarity in identities:
+            if person_name:
+                detected = True
+                self._on_match(person_name, similarity, camera_idx)
+        return detected
+
+    def _match_faces(self, embeddings: List[Tuple[int, np.ndarray]], camera_idx: int) -> bool:
+        """与已知人脸比对，缓存识别结果，命中时记录日志并发送通知"""
+        identities = self._identify_faces(embeddings, camera_idx)
+        tracker = self._get_tracker(camera_idx)
+        for track_id, person_name, similarity in identities:
+            tracker.set_identity(track_id, person_name, similarity)
+        return self._report_matches(identities, camera_idx)
+
+    def _on_match(self, person_name: str, similarity: float, camera_idx: int) -> None:
+        """命中目标人物：记录日志、回调并发送通知"""
+        self.stats_collector.count("matches", camera_idx)
+        self.logger.log(f"Camera {camera_idx}: Detected {person_name} ({similarity:.2%})",
+                        event="detection", camera=camera_idx, person=person_name,
+                        similarity=round(float(similarity), 4))
+
+        if self._callback:
+            self._callback(person_name)
+
+        if self.notifier:
+            # 只入队，由通知器后台线程合并、限流后发送
+            self.notifier.notify(person_name, similarity, camera_idx)
+
     def process_frame(self, frame: np.ndarray, camera_idx: int) -> bool:
         """
         处理摄像头帧（带帧跳过优化和人脸跟踪）
@@ -107,46 +519,86 @@ class SentinelMonitor:
             是否检测到目标人物
         """
         self.ensure_models_loaded()
-        self.frame_count += 1
-
-        # 帧跳过逻辑：只处理每N帧
-        if self.frame_count % self.config.frame_skip != 0:
-            return False
 
-        boxes = self.detector.detect(frame, self.config.confidence_threshold)
-        if not boxes:
-            self.tracker.update([])
+        if not self._should_process(camera_idx):
             return False
 
-        # 更新跟踪器
-        tracks = self.tracker.update(boxes)
-        detected = False
+        start = time.perf_counter()
+        try:
+            faces = self._detect_faces(frame, camera_idx)
+            if not faces:
+                return False
 
-        # 对每个跟踪对象进行人脸识别
-        for track_id, track in tracks.items():
-            x1, y1, x2, y2 = track.bbox
-            face_img = frame[int(y1):int(y2), int(x1):int(x2)]
+            # 对每个跟踪对象进行人脸识别
+            embeddings = self._embed_faces(frame, faces, camera_idx)
+            return self._match_faces(embeddings, camera_idx)
+        finally:
+            self._record_processing(camera_idx, time.perf_counter() - start)
 
-            if face_img.size == 0:
-                continue
+    def process_frames(self, frames: List[Tuple[int, np.ndarray]]) -> bool:
+        """
+        批量处理多个摄像头的当前帧（一次YOLO推理覆盖所有摄像头）
 
-            try:
-                embedding = self.recognizer.get_embedding(face_img)
-                person_name, similarity = self.recognizer.compare_faces(embedding, self.config.threshold)
+        参数:
+            frames: [(camera_idx, frame), ...]
 
-                if person_name:
-                    self.logger.log(f"Camera {camera_idx}: Detected {person_name} ({similarity:.2%})")
-                    detected = True
+        返回:
+            是否检测到目标人物
+        """
+        self.ensure_models_loaded()
 
-                    if self._callback:
-                        self._callback(person_name)
+        # 帧跳过逻辑与逐帧处理一致
+        frames = [(idx, frame) for idx, frame in frames if self._should_process(idx)]
+        if not frames:
+            return False
 
-                    if self.notifier:
-                        notification = create_detection_notification(person_name, similarity, camera_idx)
-                        self.notifier.send(notification['subject'], notification['body'])
+        start = time.perf_counter()
+        try:
+            return self._process_batch(frames)
+        finally:
+            # 批处理耗时由参与的摄像头平摊
+            elapsed = (time.perf_counter() - start) / len(frames)
+            for camera_idx, _ in frames:
+                self._record_processing(camera_idx, elapsed)
+
+    def _process_batch(self, frames: List[Tuple[int, np.ndarray]]) -> bool:
+        """批量检测、特征提取与比对"""
+
+        # 需要检测的帧合并为一次批量检测，其余帧只做运动预测
+        keyframes = [(idx, frame) for idx, frame in frames if self._needs_detection(frame, idx)]
+        all_boxes = []
+        if keyframes:
+            start = time.perf_counter()
+            all_boxes = self.detector.detect_batch(
+                [frame for _, frame in keyframes], self.config.confidence_threshold
+            )
+            self.stats_collector.record_shared("detect", [idx for idx, _ in keyframes], time.perf_counter() - start)
+            for camera_idx, _ in keyframes:
+                self.stats_collector.count("frames_detected", camera_idx)
+        faces_by_camera = {
+            camera_idx: self._update_tracks(boxes, camera_idx)
+            for (camera_idx, _), boxes in zip(keyframes, all_boxes)
+        }
+
+        # 收集所有摄像头的人脸，合并为一次特征提取
+        crops = []
+        owners = []
+        for camera_idx, frame in frames:
+            faces = faces_by_camera.get(camera_idx)
+            if faces is None:
+                faces = self._predict_tracks(camera_idx)
+            for crop in self._crop_faces(frame, faces, camera_idx):
+                crops.append(crop)
+                owners.append(camera_idx)
+
+        embeddings_by_camera: Dict[int, List[Tuple[int, np.ndarray]]] = {}
+        for camera_idx, item in zip(owners, self._embed_crops(crops, owners)):
+            embeddings_by_camera.setdefault(camera_idx, []).append(item)
 
-            except Exception as e:
-                self.logger.log(f"Face processing error: {e}")
+        detected = False
+        for camera_idx, embeddings in embeddings_by_camera.items():
+            if self._match_faces(embeddings, camera_idx):
+                detected = True
 
         return detected
 
@@ -160,34 +612,168 @@ class SentinelMonitor:
         self._callback = callback
         self.ensure_models_loaded()
         self.running = True
+        self._start_metrics_server()
         self.logger.log("Sentinel started, monitoring...")
 
+        try:
+            if self.config.worker_processes > 0 and self.cameras:
+                self._run_multiprocess()
+            elif self.config.pipeline:
+                self._run_pipelined()
+            else:
+                self._run_sequential()
+        except KeyboardInterrupt:
+            self.logger.log("User interrupted")
+        finally:
+            self.shutdown()
+
+    def _start_metrics_server(self) -> None:
+        """按配置启动本机指标HTTP服务（在独立线程中响应抓取）"""
+        if self.config.metrics_port <= 0 or self.metrics_server is not None:
+            return
+        try:
+            self.metrics_server = MetricsServer(self, self.config.metrics_port)
+            self.metrics_server.start()
+            self.logger.log(
+                f"Metrics available at http://{self.metrics_server.host}:{self.metrics_server.port}/metrics"
+            )
+        except OSError as e:
+            self.metrics_server = None
+            self.logger.log(f"Failed to start metrics server: {e}")
+
+    def _run_sequential(self):
+        """单线程顺序执行：检测、识别依次进行"""
+        while self.running:
+            # 检查配置热重载
+            if self._config_watcher:
+                self._config_watcher.check_for_changes()
+
+            packets = [p for p in (reader.read_latest() for reader in self.cameras) if p is not None]
+            got_frame = bool(packets)
+            self._record_capture(packets)
+
+            if len(self.cameras) > 1:
+                # 多摄像头：合并为一次批量检测
+                if packets and self.process_frames([(p.camera_idx, p.frame) for p in packets]):
+                    self._lock_screen()
+                    self.running = False
+                    break
+            else:
+                for packet in packets:
+                    if self.process_frame(packet.frame, packet.camera_idx):
+                        self._lock_screen()
+                        self.running = False
+                        break
+
+            if self.config.show_feed:
+                for packet in packets:
+                    cv2.imshow(f'Camera {packet.camera_idx} - Press Q to quit', packet.frame)
+
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+
+            # 所有摄像头都没有新帧时短暂让出CPU
+            if not got_frame:
+                if self._sources_drained():
+                    self.logger.log("All frame sources finished")
+                    break
+                time.sleep(0.002)
+
+    def _run_pipelined(self):
+        """流水线执行：采集、检测、特征提取、比对分别在独立线程中重叠运行"""
+        self.pipeline = InferencePipeline(self, queue_size=self.config.pipeline_queue_size)
+        self.pipeline.start()
+
         try:
             while self.running:
                 # 检查配置热重载
                 if self._config_watcher:
                     self._config_watcher.check_for_changes()
 
-                for idx, cap in enumerate(self.cameras):
-                    ret, frame = cap.read()
-                    if not ret:
-                        continue
+                job = self.pipeline.wait_detection(timeout=0.02)
+                if job is not None:
+                    self._lock_screen()
+                    self.running = False
+                    break
 
-                    if self.process_frame(frame, idx):
-                        self.locker.lock()
-                        self.running = False
-                        break
+                if self._sources_drained() and self.pipeline.idle():
+                    self.logger.log("All frame sources finished")
+                    break
 
-                    if self.config.show_feed:
+                if self.config.show_feed:
+                    for idx, frame in self.pipeline.latest_frames().items():
                         cv2.imshow(f'Camera {idx} - Press Q to quit', frame)
 
                 if cv2.waitKey(1) & 0xFF == ord('q'):
                     break
+        finally:
+            self.pipeline.stop()
+            dropped = self.pipeline.dropped_counts()
+            self.logger.log(
+                f"Pipeline dropped: detect {dropped['detect']}, "
+                f"embed {dropped['embed']}, match {dropped['match']}"
+            )
+
+    def _run_multiprocess(self):
+        """
+        多进程执行：本进程负责采集、帧调度和锁屏决策，检测与识别在工作进程中进行
 
-        except KeyboardInterrupt:
-            self.logger.log("User interrupted")
+        帧通过共享内存传给工作进程；每个摄像头同一时刻最多一帧在处理，处理期间到达的帧直接丢弃（只处理最新帧）。
+        """
+        pool = WorkerPool(self.config, len(self.cameras), self.config.worker_processes,
+                          model_factory=self.worker_models)
+        pool.start()
+        self.logger.log(f"Started {pool.processes} worker processes for {len(self.cameras)} cameras")
+
+        try:
+            while self.running:
+                # 检查配置热重载
+                if self._config_watcher:
+                    self._config_watcher.check_for_changes()
+
+                packets = []
+                for reader in self.cameras:
+                    if pool.busy(reader.camera_idx):
+                        continue
+                    packet = reader.read_latest()
+                    if packet is None:
+                        continue
+                    packets.append(packet)
+                    if self._should_process(packet.camera_idx):
+                        pool.submit(packet.camera_idx, packet.frame, packet.seq)
+                self._record_capture(packets)
+
+                detected = False
+                for result in pool.results(timeout=0.005):
+                    self.scheduler.record(result.camera_idx, result.elapsed, result.faces)
+                    self._frame_done(result.camera_idx, result.seq)
+                    for person_name, similarity in result.matches:
+                        detected = True
+                        self._on_match(person_name, similarity, result.camera_idx)
+
+                if detected:
+                    self._lock_screen()
+                    self.running = False
+                    break
+
+                if not packets and not pool.in_flight and self._sources_drained():
+                    self.logger.log("All frame sources finished")
+                    break
+
+                if pool.alive() < pool.processes:
+                    self.logger.log("Error: worker process exited unexpectedly", print_console=True)
+                    break
+
+                if self.config.show_feed:
+                    for packet in packets:
+                        cv2.imshow(f'Camera {packet.camera_idx} - Press Q to quit', packet.frame)
+
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    break
         finally:
-            self.shutdown()
+            pool.stop()
+            for worker_id, timings in sorted(pool.ready.items()):
+                self.logger.log(f"Worker {worker_id} startup: {timings.get('total', 0.0):.2f}s")
 
     def stop(self):
         """停止监控系统"""
@@ -196,8 +782,42 @@ class SentinelMonitor:
 
     def shutdown(self):
         """关闭监控系统"""
-        for cap in self.cameras:
-            cap.release()
+        for reader in self.cameras:
+            stats = reader.stats()
+            self.logger.log(
+                f"Camera {reader.camera_idx}: captured {stats['captured']}, "
+                f"dropped {stats['dropped']}, stale {stats['stale']}"
+            )
+            reader.release()
+        self.cameras = []
+        for camera_idx, gate in self.motion_gate_stats().items():
+            self.logger.log(
+                f"Camera {camera_idx}: motion gate hit {gate['hit_rate']:.1%}, "
+                f"skip {gate['skip_rate']:.1%} ({gate['refreshes']} refreshes)"
+            )
+        for camera_idx, rate in self.processing_rates().items():
+            self.logger.log(
+                f"Camera {camera_idx}: skip {rate['skip']}, {rate['fps']:.1f} fps processed, "
+                f"{rate['cost_ms']:.1f} ms/frame",
+                event="camera_rate", camera=camera_idx, skip=rate['skip'], fps=round(rate['fps'], 2),
+                latency_ms=round(rate['cost_ms'], 2)
+            )
+        if self.stats_collector.enabled:
+            for camera_idx, camera in sorted(self.stats()['cameras'].items()):
+                stages = ", ".join(
+                    f"{stage} p50 {summary['p50_ms']:.1f}/p99 {summary['p99_ms']:.1f} ms"
+                    for stage, summary in camera['latency'].items()
+                )
+                self.logger.log(f"Camera {camera_idx} stats: {camera['counters']} {stages}")
+        if self._faces_watcher:
+            self._faces_watcher.stop()
+            self._faces_watcher = None
+        if self.notifier:
+            self.notifier.close()
+        if self.metrics_server:
+            self.metrics_server.stop()
+            self.metrics_server = None
         cv2.destroyAllWindows()
         self.running = False
         self.logger.log("Sentinel shutdown")
+        self.logger.close()
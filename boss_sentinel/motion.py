@@ -0,0 +1,87 @@
+import time
+import cv2
+import numpy as np
+from typing import Dict, Optional
+
+
+class MotionGate:
+    """
+    运动门控 - 检测器前的廉价预过滤
+
+    在缩小的灰度图上做帧差，只有画面变化超过阈值、或距上次放行超过刷新间隔时才放行，
+    避免在画面长时间静止（夜间、空房间）时运行YOLO。
+    """
+
+    def __init__(self, threshold: float = 0.01, refresh_interval: float = 5.0,
+                 width: int = 160, pixel_threshold: int = 25):
+        """
+        初始化运动门控
+
+        参数:
+            threshold: 变化像素占比阈值(0-1)，超过则认为有运动
+            refresh_interval: 强制放行的最长间隔（秒）
+            width: 帧差计算使用的图像宽度
+            pixel_threshold: 单个像素灰度变化阈值
+        """
+        self.threshold = threshold
+        self.refresh_interval = refresh_interval
+        self.width = width
+        self.pixel_threshold = pixel_threshold
+        self._previous: Optional[np.ndarray] = None
+        self._last_pass = 0.0
+        self.passed = 0
+        self.skipped = 0
+        self.refreshes = 0
+
+    def _downscale(self, frame: np.ndarray) -> np.ndarray:
+        """缩小并转换为模糊灰度图"""
+        height = max(1, int(frame.shape[0] * self.width / frame.shape[1]))
+        small = cv2.resize(frame, (self.width, height), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+        return cv2.GaussianBlur(gray, (5, 5), 0)
+
+    def check(self, frame: np.ndarray, now: Optional[float] = None) -> bool:
+        """
+        判断当前帧是否需要送入检测器
+
+        参数:
+            frame: 摄像头帧(BGR格式)
+            now: 当前时间（默认 time.time()）
+
+        返回:
+            True表示放行（运行检测器）
+        """
+        now = time.time() if now is None else now
+        gray = self._downscale(frame)
+        previous, self._previous = self._previous, gray
+
+        if previous is None or previous.shape != gray.shape:
+            motion = True
+        else:
+            diff = cv2.absdiff(gray, previous)
+            changed = np.count_nonzero(diff > self.pixel_threshold)
+            motion = changed / diff.size >= self.threshold
+
+        if motion:
+            self.passed += 1
+            self._last_pass = now
+            return True
+
+        if now - self._last_pass >= self.refresh_interval:
+            self.refreshes += 1
+            self._last_pass = now
+            return True
+
+        self.skipped += 1
+        return False
+
+    def stats(self) -> Dict[str, float]:
+        """获取放行/跳过统计"""
+        total = self.passed + self.refreshes + self.skipped
+        return {
+            'passed': self.passed,
+            'refreshes': self.refreshes,
+            'skipped': self.skipped,
+            'hit_rate': (self.passed + self.refreshes) / total if total else 0.0,
+            'skip_rate': self.skipped / total if total else 0.0,
+        }
@@ -1,62 +1,247 @@
+import time
+import queue
 import smtplib
+import threading
+from collections import deque
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Callable, Deque, Dict, List, Optional, Tuple
 from .config import EmailConfig
 
+# 一次检测: (人物名称, 相似度, 摄像头索引, 检测时间)
+Detection = Tuple[str, float, int, float]
+
+
 class EmailNotifier:
-    """邮件通知服务"""
-    
-    def __init__(self, config: EmailConfig):
+    """
+    邮件通知服务
+
+    notify() 只把检测结果放入队列，由后台线程发送，不阻塞检测循环:
+    - SMTP连接在多封邮件之间复用，断开后自动重连
+    - 同一人物在 coalesce_window 秒内的重复检测合并为一封邮件
+    - 每小时最多发送 max_per_hour 封，超出的检测留到后续邮件中合并发送
+
+    smtp_factory 可替换为本地SMTP替身（配合 use_tls=False），便于测试。
+    """
+
+    IDLE_TIMEOUT = 300.0  # 连接空闲超过该时长（秒）后主动断开，下次发送时重连
+
+    def __init__(self, config: EmailConfig,
+                 smtp_factory: Optional[Callable[[str, int, float], smtplib.SMTP]] = None,
+                 queue_size: int = 100):
         """
         初始化邮件通知服务
-        
+
         参数:
             config: 邮件配置
+            smtp_factory: 创建SMTP连接的函数 (服务器, 端口, 超时) -> SMTP对象，默认为 smtplib.SMTP
+            queue_size: 待发送检测队列容量，满时丢弃新的检测
         """
         self.config = config
-        
+        self.smtp_factory = smtp_factory or (lambda host, port, timeout: smtplib.SMTP(host, port, timeout=timeout))
+        self._queue: "queue.Queue[Optional[Detection]]" = queue.Queue(maxsize=queue_size)
+        self._server: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+        # 合并与限流状态（仅在后台线程中访问）
+        self._last_sent: Dict[str, float] = {}  # 人物 -> 上次发送时间
+        self._pending: Dict[str, List[Detection]] = {}  # 人物 -> 尚未发送的检测
+        self._sent_times: Deque[float] = deque()  # 最近一小时的发送时间
+
+        self.stats = {'sent': 0, 'coalesced': 0, 'rate_limited': 0, 'dropped': 0, 'failed': 0}
+
+    def notify(self, person_name: str, similarity: float, camera_idx: int) -> bool:
+        """
+        提交一次检测（非阻塞）
+
+        返回:
+            是否成功放入队列
+        """
+        if self._closed:
+            return False
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait((person_name, float(similarity), camera_idx, time.time()))
+            return True
+        except queue.Full:
+            self.stats['dropped'] += 1
+            return False
+
     def send(self, subject: str, body: str) -> bool:
         """
-        发送邮件通知
-        
+        发送邮件通知（同步，复用已有连接）
+
         参数:
             subject: 邮件主题
             body: 邮件正文
-            
+
         返回:
             是否发送成功
         """
-        try:
-            msg = MIMEMultipart()
-            msg['From'] = self.config.sender
-            msg['To'] = self.config.receiver
-            msg['Subject'] = subject
-            
-            msg.attach(MIMEText(body, 'plain'))
-            
-            with smtplib.SMTP(self.config.smtp_server, self.config.smtp_port) as server:
-                server.starttls()
-                server.login(self.config.username, self.config.password)
+        msg = MIMEMultipart()
+        msg['From'] = self.config.sender
+        msg['To'] = self.config.receiver
+        msg['Subject'] = subject
+        msg.attach(MIMEText(body, 'plain'))
+
+        # 复用的连接可能已被服务器断开，失败后重连重试一次
+        for attempt in range(2):
+            try:
+                server = self._connect()
                 server.send_message(msg)
-                
-            return True
-        except Exception as e:
-            print(f"发送邮件失败: {e}")
-            return False
+                self._last_used = time.time()
+                return True
+            except Exception as e:
+                self._disconnect()
+                if attempt:
+                    self.stats['failed'] += 1
+                    print(f"发送邮件失败: {e}")
+        return False
 
-def create_detection_notification(person_name: str, similarity: float, camera_idx: int) -> Dict[str, str]:
-    """创建检测通知内容"""
-    return {
-        'subject': "哨兵系统检测到已知人物",
-        'body': f"""
+    def close(self, timeout: float = 5.0) -> None:
+        """
+        停止后台线程：发送所有未发送的合并检测后断开连接
+
+        参数:
+            timeout: 最长等待时间（秒），0表示不等待，由后台线程自行完成
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is None:
+            self._disconnect()
+            return
+        self._queue.put(None)
+        if timeout > 0:
+            self._thread.join(timeout)
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="EmailNotifier", daemon=True)
+            self._thread.start()
+
+    def _connect(self) -> smtplib.SMTP:
+        """获取SMTP连接，没有可用连接时新建并登录"""
+        if self._server is None:
+            server = self.smtp_factory(self.config.smtp_server, self.config.smtp_port, self.config.timeout)
+            try:
+                if self.config.use_tls:
+                    server.starttls()
+                if self.config.username:
+                    server.login(self.config.username, self.config.password)
+            except Exception:
+                server.close()
+                raise
+            self._server = server
+        return self._server
+
+    def _disconnect(self) -> None:
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except Exception:
+            self._server.close()
+        self._server = None
+
+    def _rate_limited(self, now: float) -> bool:
+        while self._sent_times and now - self._sent_times[0] >= 3600:
+            self._sent_times.popleft()
+        return 0 < self.config.max_per_hour <= len(self._sent_times)
+
+    def _handle(self, detection: Detection) -> None:
+        """新的检测：窗口外立即发送，窗口内合并"""
+        person_name = detection[0]
+        self._pending.setdefault(person_name, []).append(detection)
+        if len(self._pending[person_name]) > 1:
+            self.stats['coalesced'] += 1
+        elif self._rate_limited(time.time()):
+            self.stats['rate_limited'] += 1
+
+    def _flush(self, person_name: str, now: float, force: bool = False) -> None:
+        """发送某人物的待发送检测（未到合并窗口或被限流时保留）"""
+        detections = self._pending.get(person_name)
+        if not detections:
+            return
+        if not force:
+            if now - self._last_sent.get(person_name, float('-inf')) < self.config.coalesce_window:
+                return
+            if self._rate_limited(now):
+                return
+
+        notification = create_detection_notification(*_summarize(detections))
+        del self._pending[person_name]
+        self._last_sent[person_name] = now
+        self._sent_times.append(now)
+        if self.send(notification['subject'], notification['body']):
+            self.stats['sent'] += 1
+
+    def _run(self) -> None:
+        """后台发送线程"""
+        while True:
+            timeout = 1.0 if self._pending else None
+            if self._server is not None:
+                timeout = min(timeout or self.IDLE_TIMEOUT, self.IDLE_TIMEOUT)
+            try:
+                detection = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                detection = False
+
+            if detection is None:
+                break
+            try:
+                if detection:
+                    self._handle(detection)
+
+                now = time.time()
+                for person_name in list(self._pending):
+                    self._flush(person_name, now)
+                if self._server is not None and now - self._last_used >= self.IDLE_TIMEOUT:
+                    self._disconnect()
+            except Exception as e:
+                # 任何异常都不能结束发送线程，否则之后的检测会静默丢失
+                print(f"邮件通知处理失败: {e}")
+
+        # 关闭前发送所有合并中的检测（不受限流限制）
+        try:
+            now = time.time()
+            for person_name in list(self._pending):
+                self._flush(person_name, now, force=True)
+        finally:
+            self._disconnect()
+
+
+def _summarize(detections: List[Detection]) -> Tuple[str, float, int, float, int]:
+    """将同一人物的多次检测合并为通知参数：取相似度最高的一次，并记录其余次数"""
+    person_name, similarity, camera_idx, detected_at = max(detections, key=lambda d: d[1])
+    return person_name, similarity, camera_idx, detected_at, len(detections) - 1
+
+
+def create_detection_notification(person_name: str, similarity: float, camera_idx: int,
+                                  detected_at: Optional[float] = None, repeats: int = 0) -> Dict[str, str]:
+    """
+    创建检测通知内容
+
+    参数:
+        detected_at: 检测时间戳，默认为当前时间
+        repeats: 合并进本通知的其他检测次数
+    """
+    detected_time = datetime.fromtimestamp(detected_at) if detected_at else datetime.now()
+    body = f"""
 哨兵系统检测到已知人物！
 
 详细信息:
 - 人物名称: {person_name}
 - 相似度: {similarity:.2%}
 - 摄像头索引: {camera_idx}
-- 检测时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+- 检测时间: {detected_time.strftime('%Y-%m-%d %H:%M:%S')}
 """
-    }
\ No newline at end of file
+    if repeats:
+        body += f"- 合并的重复检测: {repeats} 次\n"
+    return {
+        'subject': "哨兵系统检测到已知人物",
+        'body': body
+    }
@@ -0,0 +1,269 @@
+import time
+import queue
+import threading
+import numpy as np
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .monitor import SentinelMonitor
+
+
+class DropOldestQueue:
+    """有界队列 - 队列满时丢弃最旧的元素，避免延迟累积"""
+
+    def __init__(self, maxsize: int = 2):
+        """
+        初始化队列
+
+        参数:
+            maxsize: 队列容量
+        """
+        self._items: deque = deque(maxlen=max(1, maxsize))
+        self._cond = threading.Condition()
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, item: Any) -> None:
+        """放入元素，队列已满时丢弃最旧的元素"""
+        with self._cond:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """
+        取出最旧的元素
+
+        返回:
+            队首元素；超时或队列已关闭时返回None
+        """
+        with self._cond:
+            if not self._items and not self._closed:
+                self._cond.wait(timeout)
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+    def qsize(self) -> int:
+        """当前队列长度"""
+        return len(self._items)
+
+    def close(self) -> None:
+        """关闭队列并唤醒所有等待者"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+@dataclass
+class FrameJob:
+    """流水线中流转的单帧任务"""
+    camera_idx: int
+    frame: np.ndarray
+    timestamp: float
+    seq: int
+    faces: List[Tuple[int, Tuple[float, float, float, float]]] = field(default_factory=list)
+    embeddings: List[Tuple[int, np.ndarray]] = field(default_factory=list)
+    identities: List[Tuple[int, Optional[str], float]] = field(default_factory=list)  # 比对结果
+    detected: bool = False
+    cost: float = 0.0  # 各阶段累计处理耗时（秒）
+
+
+class InferencePipeline:
+    """
+    分阶段推理流水线
+
+    采集 → 检测 → 特征提取 → 比对，各阶段运行在独立线程中，
+    阶段之间通过有界队列连接，第N+1帧的YOLO检测与第N帧的FaceNet推理重叠执行。
+    每个阶段的处理逻辑复用 SentinelMonitor 的对应方法，检测语义与顺序模式一致。
+
+    跟踪器只在检测线程中读写：比对结果经队列交回检测线程写入跟踪器；
+    已送出识别、尚无结果的跟踪对象不会被后续帧重复送出。
+    """
+
+    PENDING_TIMEOUT = 30  # 送出识别的跟踪对象超过该帧数仍无结果（任务被丢弃）时允许重新送出
+
+    def __init__(self, monitor: "SentinelMonitor", queue_size: int = 2):
+        """
+        初始化流水线
+
+        参数:
+            monitor: 提供检测/识别逻辑的监控系统
+            queue_size: 各阶段之间队列的容量
+        """
+        self.monitor = monitor
+        self.detect_queue = DropOldestQueue(queue_size)
+        self.embed_queue = DropOldestQueue(queue_size)
+        self.match_queue = DropOldestQueue(queue_size)
+        self.result_queue = DropOldestQueue(queue_size)
+
+        self._running = False
+        self._threads: List[threading.Thread] = []
+        self._frames_lock = threading.Lock()
+        self._latest_frames: Dict[int, np.ndarray] = {}
+        # 任务计数：送入流水线的任务 = 已离开的任务 + 被丢弃的任务 时流水线空闲
+        self._count_lock = threading.Lock()
+        self._submitted = 0
+        self._completed = 0
+        # 离开流水线的任务: (摄像头, 送出识别的跟踪对象ID, 比对结果)，由检测线程处理
+        self._identities: "queue.SimpleQueue[Tuple[int, List[int], List[Tuple[int, Optional[str], float]]]]" = \
+            queue.SimpleQueue()
+        self._pending: Dict[int, Dict[int, int]] = {}  # 摄像头 -> {识别中的track_id: 送出时的帧序号}（仅检测线程访问）
+
+    def start(self) -> None:
+        """启动所有阶段线程"""
+        if self._running:
+            return
+        self._running = True
+
+        stages: List[Tuple[str, Callable[[], None]]] = [
+            ("capture", self._capture_loop),
+            ("detect", lambda: self._stage_loop(self.detect_queue, self._detect, self.embed_queue)),
+            ("embed", lambda: self._stage_loop(self.embed_queue, self._embed, self.match_queue)),
+            ("match", lambda: self._stage_loop(self.match_queue, self._match, self.result_queue)),
+        ]
+        for name, target in stages:
+            thread = threading.Thread(target=target, name=f"Pipeline-{name}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        """停止流水线并等待线程退出"""
+        self._running = False
+        for stage_queue in (self.detect_queue, self.embed_queue, self.match_queue, self.result_queue):
+            stage_queue.close()
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+        self._threads = []
+
+    def _capture_loop(self) -> None:
+        """采集阶段：从各摄像头读取最新帧，按帧跳过规则送入检测队列"""
+        while self._running:
+            got_frame = False
+            for reader in self.monitor.cameras:
+                packet = reader.read_latest()
+                if packet is None:
+                    continue
+
+                got_frame = True
+                self.monitor._record_capture([packet])
+                with self._frames_lock:
+                    self._latest_frames[packet.camera_idx] = packet.frame
+
+                if self.monitor._should_process(packet.camera_idx):
+                    with self._count_lock:
+                        self._submitted += 1
+                    self.detect_queue.put(
+                        FrameJob(packet.camera_idx, packet.frame, packet.timestamp, packet.seq)
+                    )
+
+            if not got_frame:
+                time.sleep(0.002)
+
+    def _stage_loop(self, in_queue: DropOldestQueue,
+                    handler: Callable[[FrameJob], bool],
+                    out_queue: DropOldestQueue) -> None:
+        """通用阶段循环：取任务、处理、按需传递给下一阶段"""
+        while self._running:
+            job = in_queue.get(timeout=0.1)
+            if job is None:
+                continue
+            start = time.perf_counter()
+            try:
+                passed = handler(job)
+            except Exception as e:
+                self.monitor.logger.log(f"Pipeline error: {e}")
+                passed = False
+            job.cost += time.perf_counter() - start
+
+            if passed:
+                out_queue.put(job)
+            if not passed or out_queue is self.result_queue:
+                # 任务离开流水线，反馈给调度器
+                self.monitor._record_processing(job.camera_idx, job.cost)
+                self.monitor._frame_done(job.camera_idx, job.seq)
+                if job.faces:
+                    self._identities.put((job.camera_idx, [track_id for track_id, _ in job.faces], job.identities))
+                with self._count_lock:
+                    self._completed += 1
+
+    def _detect(self, job: FrameJob) -> bool:
+        """检测阶段（唯一读写跟踪器的线程）：先写回已有的比对结果，只送出不在识别中的跟踪对象"""
+        self._apply_identities()
+        faces = self.monitor._detect_faces(job.frame, job.camera_idx)
+
+        tracker = self.monitor._get_tracker(job.camera_idx)
+        pending = self._pending.setdefault(job.camera_idx, {})
+        for track_id in [track_id for track_id in pending if track_id not in tracker.tracks]:
+            del pending[track_id]
+        job.faces = [
+            (track_id, bbox) for track_id, bbox in faces
+            if tracker.frame_index - pending.get(track_id, -self.PENDING_TIMEOUT) >= self.PENDING_TIMEOUT
+        ]
+        for track_id, _ in job.faces:
+            pending[track_id] = tracker.frame_index
+        return bool(job.faces)
+
+    def _apply_identities(self) -> None:
+        """把离开流水线的任务的比对结果写回跟踪器，并解除对应跟踪对象的识别中标记"""
+        while True:
+            try:
+                camera_idx, track_ids, identities = self._identities.get_nowait()
+            except queue.Empty:
+                return
+            pending = self._pending.get(camera_idx, {})
+            for track_id in track_ids:
+                pending.pop(track_id, None)
+            tracker = self.monitor._get_tracker(camera_idx)
+            for track_id, person_name, similarity in identities:
+                tracker.set_identity(track_id, person_name, similarity)
+
+    def _embed(self, job: FrameJob) -> bool:
+        """特征提取阶段"""
+        job.embeddings = self.monitor._embed_faces(job.frame, job.faces, job.camera_idx)
+        return bool(job.embeddings)
+
+    def _match(self, job: FrameJob) -> bool:
+        """比对阶段：比对结果随任务离开流水线后由检测线程写回跟踪器，只有命中目标人物的任务进入结果队列"""
+        job.identities = self.monitor._identify_faces(job.embeddings, job.camera_idx)
+        job.detected = self.monitor._report_matches(job.identities, job.camera_idx)
+        return job.detected
+
+    def wait_detection(self, timeout: float = 0.1) -> Optional[FrameJob]:
+        """
+        等待检测结果
+
+        返回:
+            命中目标人物的任务；超时返回None
+        """
+        return self.result_queue.get(timeout=timeout)
+
+    def idle(self) -> bool:
+        """所有送入的任务都已处理完或被丢弃"""
+        dropped = sum(self.dropped_counts().values())
+        with self._count_lock:
+            return self._submitted == self._completed + dropped
+
+    def latest_frames(self) -> Dict[int, np.ndarray]:
+        """获取各摄像头最新一帧（用于画面显示）"""
+        with self._frames_lock:
+            return dict(self._latest_frames)
+
+    def queue_depths(self) -> Dict[str, int]:
+        """获取各阶段队列深度"""
+        return {
+            'detect': self.detect_queue.qsize(),
+            'embed': self.embed_queue.qsize(),
+            'match': self.match_queue.qsize(),
+        }
+
+    def dropped_counts(self) -> Dict[str, int]:
+        """获取各阶段因背压丢弃的任务数"""
+        return {
+            'detect': self.detect_queue.dropped,
+            'embed': self.embed_queue.dropped,
+            'match': self.match_queue.dropped,
+        }
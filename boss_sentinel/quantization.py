@@ -0,0 +1,272 @@
+"""
+FaceNet INT8 量化
+
+支持两种精度模式:
+- int8_dynamic: 动态量化（权重INT8，激活运行时量化），无需校准数据
+- int8_static: 静态量化（权重与激活均为INT8），使用 known_faces/ 中的照片校准
+
+PyTorch 后端使用 torch.ao.quantization（动态量化仅覆盖全连接层，静态量化使用FX图模式覆盖卷积层）；
+ONNX 后端使用 onnxruntime.quantization（动态/静态量化均覆盖卷积层）。
+
+生成精度报告（与fp32比较特征漂移、留一法比对结果一致性和单张人脸耗时；静态量化时校准与评估使用不同的照片）:
+    python -m boss_sentinel.quantization --known-faces known_faces --precision int8_static
+"""
+import os
+import copy
+import glob
+import time
+import hashlib
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+from .backends import InferenceBackend, TorchBackend, OnnxBackend
+
+PRECISIONS = ("fp32", "int8_dynamic", "int8_static")
+
+
+def quantize_torch(resnet, precision: str, calibration: Optional[np.ndarray] = None):
+    """
+    量化 PyTorch 版 InceptionResnetV1
+
+    参数:
+        resnet: fp32模型（不会被修改）
+        precision: "int8_dynamic" 或 "int8_static"
+        calibration: 静态量化的校准数据 (N, 3, 160, 160)，float32
+
+    返回:
+        量化后的模型（仅支持CPU推理）
+    """
+    import torch
+    from torch.ao.quantization import quantize_dynamic, get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import prepare_fx, convert_fx
+
+    model = copy.deepcopy(resnet).cpu().eval()
+    if precision == "int8_dynamic":
+        return quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    if calibration is None or len(calibration) == 0:
+        raise ValueError("静态量化需要校准图像")
+
+    example = (torch.from_numpy(calibration[:1]),)
+    prepared = prepare_fx(model, get_default_qconfig_mapping("x86"), example)
+    with torch.no_grad():
+        for start in range(0, len(calibration), 16):
+            prepared(torch.from_numpy(calibration[start:start + 16]))
+    return convert_fx(prepared)
+
+
+def quantize_onnx(onnx_path: str, output_path: str, precision: str,
+                  calibration: Optional[np.ndarray] = None) -> str:
+    """
+    量化 ONNX 版 FaceNet
+
+    参数:
+        onnx_path: fp32 ONNX模型路径
+        output_path: 量化模型输出路径
+        precision: "int8_dynamic" 或 "int8_static"
+        calibration: 静态量化的校准数据 (N, 3, 160, 160)，float32
+
+    返回:
+        量化模型路径
+    """
+    from onnxruntime.quantization import (quantize_dynamic, quantize_static, QuantType,
+                                          CalibrationDataReader, QuantFormat)
+
+    if precision == "int8_dynamic":
+        quantize_dynamic(onnx_path, output_path, weight_type=QuantType.QInt8)
+        return output_path
+
+    if calibration is None or len(calibration) == 0:
+        raise ValueError("静态量化需要校准图像")
+
+    class _Reader(CalibrationDataReader):
+        def __init__(self, data: np.ndarray):
+            self._batches = iter([{"input": data[i:i + 1]} for i in range(len(data))])
+
+        def get_next(self):
+            return next(self._batches, None)
+
+    quantize_static(onnx_path, output_path, _Reader(calibration),
+                    quant_format=QuantFormat.QDQ, weight_type=QuantType.QInt8,
+                    activation_type=QuantType.QUInt8, per_channel=True)
+    return output_path
+
+
+def quantized_onnx_path(onnx_path: str, precision: str, calibration: Optional[np.ndarray] = None) -> str:
+    """
+    量化ONNX模型的文件路径
+
+    文件名带有fp32模型（大小、修改时间）与校准数据的摘要，fp32模型或人脸库照片变化后会重新量化，
+    不会复用按旧数据校准的模型。
+    """
+    stat = os.stat(onnx_path)
+    digest = hashlib.sha1(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+    if calibration is not None:
+        digest.update(np.ascontiguousarray(calibration).tobytes())
+    return f"{os.path.splitext(onnx_path)[0]}.{precision}.{digest.hexdigest()[:12]}.onnx"
+
+
+def create_quantized_backend(backend: InferenceBackend, precision: str, resnet=None,
+                             calibration: Optional[np.ndarray] = None) -> InferenceBackend:
+    """
+    基于fp32后端创建量化后端
+
+    参数:
+        backend: fp32推理后端
+        precision: 精度模式
+        resnet: fp32 PyTorch模型（PyTorch后端需要）
+        calibration: 静态量化的校准数据
+
+    返回:
+        量化后的推理后端
+    """
+    if precision == "fp32":
+        return backend
+
+    if isinstance(backend, OnnxBackend):
+        if precision != "int8_static":
+            calibration = None
+        output_path = quantized_onnx_path(backend.model_path, precision, calibration)
+        if not os.path.exists(output_path):
+            quantize_onnx(backend.model_path, output_path, precision, calibration)
+            # 删除按旧模型或旧校准数据生成的量化文件
+            for stale in glob.glob(f"{os.path.splitext(backend.model_path)[0]}.{precision}.*.onnx"):
+                if stale != output_path:
+                    os.remove(stale)
+        return OnnxBackend(output_path)
+
+    return TorchBackend(quantize_torch(resnet, precision, calibration), device="cpu")
+
+
+def split_calibration(images: np.ndarray, labels: List[str], eval_fraction: float = 0.5,
+                      seed: int = 0) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    """
+    随机划分校准集与评估集，避免用校准过的照片评估静态量化
+
+    返回:
+        (校准图像, 评估图像, 评估图像对应的人名)
+    """
+    order = np.random.default_rng(seed).permutation(len(images))
+    n_eval = min(len(images) - 1, max(1, int(round(len(images) * eval_fraction))))
+    eval_idx, calib_idx = np.sort(order[:n_eval]), np.sort(order[n_eval:])
+    return images[calib_idx], images[eval_idx], [labels[i] for i in eval_idx]
+
+
+def _gallery_decisions(embeddings: np.ndarray, labels: List[str],
+                       threshold: float) -> Tuple[List[Optional[str]], np.ndarray]:
+    """
+    留一法比对：每张图像与不含它自身的人脸库（每人平均特征）比对
+
+    某人只有这一张照片时，留出后人脸库中没有此人，相当于一次陌生人比对。
+
+    返回:
+        (每张图像的比对结果, 最高相似度)
+    """
+    names = sorted(set(labels))
+    index = np.array([names.index(label) for label in labels])
+    embeddings = embeddings.astype(np.float64)
+    sums = np.zeros((len(names), embeddings.shape[1]))
+    np.add.at(sums, index, embeddings)
+    counts = np.bincount(index, minlength=len(names))
+
+    def normalize(vectors: np.ndarray) -> np.ndarray:
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=-1, keepdims=True), 1e-12)
+
+    # 平均特征归一化后与特征和方向相同
+    queries = normalize(embeddings)
+    scores = queries @ normalize(sums).T
+    own = np.sum(queries * normalize(sums[index] - embeddings), axis=1)
+    rows = np.arange(len(labels))
+    scores[rows, index] = np.where(counts[index] > 1, own, -np.inf)
+
+    best = scores.argmax(axis=1)
+    best_scores = scores[rows, best]
+    decisions = [names[i] if score > threshold else None for i, score in zip(best, best_scores)]
+    return decisions, best_scores
+
+
+def _latency_ms(backend: InferenceBackend, sample: np.ndarray, repeats: int = 20) -> float:
+    """单张人脸推理耗时中位数（毫秒）"""
+    backend.run(sample)  # 预热
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        backend.run(sample)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+def precision_report(reference: InferenceBackend, candidate: InferenceBackend,
+                     images: np.ndarray, labels: List[str], threshold: float = 0.7) -> Dict[str, float]:
+    """
+    比较量化模型与fp32模型
+
+    参数:
+        reference: fp32推理后端
+        candidate: 量化推理后端
+        images: 预处理后的人脸图像 (N, 3, 160, 160)，静态量化时不应包含校准用的照片
+        labels: 每张图像对应的人名
+        threshold: 比对阈值
+
+    返回:
+        余弦漂移（均值/最大值）、比对结果（留一法）一致率和单张人脸耗时
+    """
+    expected = np.concatenate([reference.run(images[i:i + 32]) for i in range(0, len(images), 32)])
+    actual = np.concatenate([candidate.run(images[i:i + 32]) for i in range(0, len(images), 32)])
+
+    cosine = np.sum(expected * actual, axis=1) / np.maximum(
+        np.linalg.norm(expected, axis=1) * np.linalg.norm(actual, axis=1), 1e-12)
+    drift = 1.0 - cosine
+
+    ref_decisions, _ = _gallery_decisions(expected, labels, threshold)
+    cand_decisions, _ = _gallery_decisions(actual, labels, threshold)
+    agreement = np.mean([a == b for a, b in zip(ref_decisions, cand_decisions)])
+
+    return {
+        'images': float(len(images)),
+        'cosine_drift_mean': float(drift.mean()),
+        'cosine_drift_max': float(drift.max()),
+        'decision_agreement': float(agreement),
+        'fp32_ms_per_face': _latency_ms(reference, images[:1]),
+        'int8_ms_per_face': _latency_ms(candidate, images[:1]),
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    """对 known_faces/ 中的照片生成量化精度/耗时报告"""
+    import argparse
+    from .recognizer import FaceRecognizer
+
+    parser = argparse.ArgumentParser(description="FaceNet INT8 量化精度/耗时报告")
+    parser.add_argument("--known-faces", default="known_faces", help="人脸库目录（用于校准与评估）")
+    parser.add_argument("--precision", default="int8_dynamic", choices=PRECISIONS[1:])
+    parser.add_argument("--backend", default="torch", choices=("torch", "onnx"))
+    parser.add_argument("--threshold", type=float, default=0.7, help="比对阈值")
+    parser.add_argument("--eval-fraction", type=float, default=0.5,
+                        help="静态量化时留作评估（不参与校准）的照片比例")
+    args = parser.parse_args(argv)
+
+    fp32 = FaceRecognizer(args.known_faces, use_cache=False, backend=args.backend)
+    images, labels = fp32.calibration_data()
+    if len(images) == 0:
+        parser.error(f"{args.known_faces} 中没有可用的照片")
+
+    calibration = None
+    if args.precision == "int8_static":
+        if len(images) < 2:
+            parser.error("静态量化至少需要2张照片（分别用于校准与评估）")
+        calibration, images, labels = split_calibration(images, labels, args.eval_fraction)
+
+    quantized = create_quantized_backend(fp32.backend, args.precision, fp32.resnet, calibration)
+    report = precision_report(fp32.backend, quantized, images, labels, args.threshold)
+
+    held_out = f"（另有 {len(calibration)} 张用于校准）" if calibration is not None else ""
+    print(f"精度模式: {args.precision} ({args.backend})，评估 {report['images']:.0f} 张照片{held_out}")
+    print(f"  余弦漂移: 平均 {report['cosine_drift_mean']:.5f}, 最大 {report['cosine_drift_max']:.5f}")
+    print(f"  比对结果一致率（留一法）: {report['decision_agreement']:.2%}")
+    print(f"  单张人脸耗时: fp32 {report['fp32_ms_per_face']:.2f} ms, "
+          f"int8 {report['int8_ms_per_face']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,149 @@
 import os
+import time
+import threading
 import cv2
 import numpy as np
-import torch
 from PIL import Image
-from facenet_pytorch import InceptionResnetV1
-from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from .embedding_cache import EmbeddingCache
+from .backends import (InferenceBackend, TorchBackend, OnnxBackend, BACKENDS,
+                       FACENET_ONNX_PATH, export_facenet_onnx, check_parity)
+from .quantization import PRECISIONS, create_quantized_backend
+
+# 模型与预处理标识，变化时磁盘特征缓存自动失效
+MODEL_ID = "InceptionResnetV1-vggface2-160"
+CACHE_FILE_NAME = ".embedding_cache.npz"
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
 
 class FaceRecognizer:
     """基于FaceNet的人脸识别器"""
 
-    def __init__(self, known_faces_dir: str = "known_faces"):
+    def __init__(self, known_faces_dir: str = "known_faces", use_cache: bool = True,
+                 progress_callback: Optional[Callable[[int, int], None]] = None,
+                 workers: int = 0, batch_size: int = 32, backend: str = "torch",
+                 precision: str = "fp32"):
         """
         初始化人脸识别器
 
         参数:
             known_faces_dir: 已知人脸图像存储目录
+            use_cache: 是否使用磁盘特征缓存（未变化的图像无需重新提取）
+            progress_callback: 人脸库加载进度回调 (已完成数, 总数)
+            workers: 图像解码线程数，0表示按CPU核数自动选择
+            batch_size: 人脸库特征提取的批大小
+            backend: 推理后端，"torch" 或 "onnx"
+            precision: 特征提取精度，"fp32"、"int8_dynamic" 或 "int8_static"（用人脸库照片校准）
         """
         self.known_faces_dir = known_faces_dir
-        self.resnet = InceptionResnetV1(pretrained='vggface2').eval()
+        self.use_cache = use_cache
+        self.workers = workers or min(32, (os.cpu_count() or 1) + 4)
+        self.batch_size = max(1, batch_size)
+        self.resnet = None  # PyTorch 版 InceptionResnetV1，ONNX 模型已导出时不加载
+        self.backend = self._create_backend(backend)
+        self.precision = precision
+        if precision != "fp32":
+            self.backend = self._quantize_backend(precision)
+        self.model_id = f"{MODEL_ID}-{self.backend.name}-{precision}"
         self.known_embeddings: Dict[str, np.ndarray] = {}
-        self._load_known_faces()
+        self._cache: Optional[EmbeddingCache] = None
+        # 每张照片的特征及所属人物，用于增量更新
+        self._file_embeddings: Dict[str, np.ndarray] = {}
+        self._file_person: Dict[str, str] = {}
+        self._update_lock = threading.Lock()
+        # 最近一次加载人脸库的统计（耗时、缓存命中数、重新提取数）
+        self.load_stats: Dict[str, float] = {}
+        # 归一化特征矩阵 (N, 512) 与对应人名，整体替换以保证读取一致
+        self._gallery: Tuple[List[str], np.ndarray] = ([], np.empty((0, 512), dtype=np.float32))
+        self._load_known_faces(progress_callback)
+
+    @staticmethod
+    def requires_torch(backend: str) -> bool:
+        """该后端是否需要加载PyTorch权重（ONNX模型已导出时不需要）"""
+        return not (backend == "onnx" and os.path.exists(FACENET_ONNX_PATH))
+
+    def _create_backend(self, backend: str) -> InferenceBackend:
+        """
+        创建推理后端
+
+        ONNX后端首次使用时从PyTorch权重导出并做一致性检查，检查失败时回退到PyTorch。
+        导出文件已存在时不再加载PyTorch权重，以减少内存占用。
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"未知的推理后端: {backend}")
+
+        if not self.requires_torch(backend):
+            return OnnxBackend(FACENET_ONNX_PATH)
+
+        # facenet_pytorch 会导入 torch，延迟到确实需要PyTorch权重时
+        from facenet_pytorch import InceptionResnetV1
+
+        if backend == "onnx":
+            self.resnet = InceptionResnetV1(pretrained='vggface2').eval()
+            export_facenet_onnx(self.resnet, FACENET_ONNX_PATH)
+            onnx_backend = OnnxBackend(FACENET_ONNX_PATH)
+            sample = np.random.default_rng(0).uniform(0, 255, (4, 3, 160, 160)).astype(np.float32)
+            parity = check_parity(TorchBackend(self.resnet), onnx_backend, sample)
+            if parity['min_cosine'] >= 0.999:
+                print(f"FaceNet ONNX 导出完成 (最小余弦相似度 {parity['min_cosine']:.6f})")
+                self.resnet = None
+                return onnx_backend
+
+            print(f"警告: FaceNet ONNX 输出与PyTorch不一致 ({parity})，回退到PyTorch后端")
+            os.remove(FACENET_ONNX_PATH)
+            return TorchBackend(self.resnet)
+
+        self.resnet = InceptionResnetV1(pretrained='vggface2').eval()
+        return TorchBackend(self.resnet)
+
+    def _quantize_backend(self, precision: str) -> InferenceBackend:
+        """
+        创建INT8量化后端
+
+        静态量化使用人脸库中的照片校准；人脸库为空时回退到动态量化。
+        """
+        if precision not in PRECISIONS:
+            raise ValueError(f"未知的精度模式: {precision}")
 
-    def _load_known_faces(self) -> None:
+        calibration = None
+        if precision == "int8_static":
+            calibration, _ = self.calibration_data()
+            if len(calibration) == 0:
+                print("警告: 人脸库为空，无法校准静态量化，改用动态量化")
+                precision = "int8_dynamic"
+
+        start = time.perf_counter()
+        backend = create_quantized_backend(self.backend, precision, self.resnet, calibration)
+        print(f"FaceNet {precision} 量化完成 ({self.backend.name}, 耗时 {time.perf_counter() - start:.2f} 秒)")
+        return backend
+
+    def calibration_data(self, limit: int = 256) -> Tuple[np.ndarray, List[str]]:
+        """
+        从人脸库读取量化校准/评估数据
+
+        参数:
+            limit: 最多读取的照片数
+
+        返回:
+            (图像批次 (N, 3, 160, 160) float32, 每张图像对应的人名)
+        """
+        if not os.path.isdir(self.known_faces_dir):
+            return np.empty((0, 3, 160, 160), dtype=np.float32), []
+
+        samples = [(person_name, path) for person_name, paths in self._scan_known_faces().items()
+                   for path in paths][:limit]
+        images, labels = [], []
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for (person_name, _), image in zip(samples, executor.map(self._load_image, [p for _, p in samples])):
+                if image is not None:
+                    images.append(image)
+                    labels.append(person_name)
+
+        if not images:
+            return np.empty((0, 3, 160, 160), dtype=np.float32), []
+        return np.stack(images).transpose(0, 3, 1, 2).astype(np.float32), labels
+
+    def _load_known_faces(self, progress_callback: Optional[Callable[[int, int], None]] = None) -> None:
         """
         加载已知人脸特征向量
 
@@ -31,89 +153,437 @@ class FaceRecognizer:
         """
         if not os.path.exists(self.known_faces_dir):
             os.makedirs(self.known_faces_dir, exist_ok=True)
+            self.known_embeddings = {}
+            self._rebuild_gallery()
             return
 
-        # 遍历目录
+        start = time.perf_counter()
+        if self.use_cache:
+            self._cache = EmbeddingCache(os.path.join(self.known_faces_dir, CACHE_FILE_NAME), self.model_id)
+
+        people = self._scan_known_faces()
+        all_paths = [path for paths in people.values() for path in paths]
+        file_embeddings, embedded = self._embed_files(all_paths, progress_callback)
+
+        self._file_embeddings = file_embeddings
+        self._file_person = {path: person_name for person_name, paths in people.items() for path in paths
+                             if path in file_embeddings}
+        known_embeddings = {}
+        for person_name, paths in people.items():
+            embeddings = [file_embeddings[path] for path in paths if path in file_embeddings]
+            if embeddings:
+                # 多张照片使用平均特征向量
+                known_embeddings[person_name] = np.mean(embeddings, axis=0)
+                print(f"已加载 {person_name} 的 {len(embeddings)} 张照片特征")
+
+        self.known_embeddings = known_embeddings
+        self._rebuild_gallery()
+
+        if self._cache is not None:
+            self._cache.prune(file_embeddings.keys())
+            self._cache.save()
+
+        self.load_stats = {
+            'elapsed': time.perf_counter() - start,
+            'images': len(file_embeddings),
+            'cached': len(file_embeddings) - embedded,
+            'embedded': embedded,
+        }
+        print(f"已加载 {len(self.known_embeddings)} 个人物特征 "
+              f"(缓存 {self.load_stats['cached']} 张, 重新提取 {embedded} 张, "
+              f"耗时 {self.load_stats['elapsed']:.2f} 秒)")
+
+    def _scan_known_faces(self) -> Dict[str, List[str]]:
+        """
+        扫描人脸库目录
+
+        返回:
+            人名 -> 图像路径列表
+        """
+        people: Dict[str, List[str]] = {}
         for entry in os.scandir(self.known_faces_dir):
             if entry.is_dir():
                 # 子目录模式: 每个子目录是一个人
-                self._load_person_directory(entry.name, entry.path)
-            elif entry.is_file() and entry.name.lower().endswith(('.png', '.jpg', '.jpeg')):
+                people.setdefault(entry.name, []).extend(
+                    img_file.path for img_file in os.scandir(entry.path)
+                    if img_file.is_file() and img_file.name.lower().endswith(IMAGE_EXTENSIONS)
+                )
+            elif entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS):
                 # 单文件模式: 文件名是人名
-                person_name = os.path.splitext(entry.name)[0]
-                self._load_single_image(person_name, entry.path)
-
-        print(f"已加载 {len(self.known_embeddings)} 个人物特征")
-
-    def _load_person_directory(self, person_name: str, dir_path: str) -> None:
-        """加载一个人的多张照片（子目录模式）"""
-        embeddings = []
-
-        for img_file in os.scandir(dir_path):
-            if img_file.is_file() and img_file.name.lower().endswith(('.png', '.jpg', '.jpeg')):
-                try:
-                    embedding = self._extract_embedding(img_file.path)
-                    if embedding is not None:
-                        embeddings.append(embedding)
-                        print(f"  加载 {person_name}/{img_file.name}")
-                except Exception as e:
-                    print(f"  警告: 加载 {img_file.path} 失败: {e}")
-
-        if embeddings:
-            # 使用平均特征向量
-            self.known_embeddings[person_name] = np.mean(embeddings, axis=0)
-            print(f"已加载 {person_name} 的 {len(embeddings)} 张照片特征")
-
-    def _load_single_image(self, person_name: str, img_path: str) -> None:
-        """加载单张照片"""
+                people.setdefault(os.path.splitext(entry.name)[0], []).append(entry.path)
+        return people
+
+    def _person_for_path(self, img_path: str) -> Optional[str]:
+        """根据图像路径推断人名（子目录名或文件名）"""
+        parts = os.path.normpath(os.path.relpath(img_path, self.known_faces_dir)).split(os.sep)
+        if len(parts) == 2:
+            return parts[0]
+        if len(parts) == 1:
+            return os.path.splitext(parts[0])[0]
+        return None
+
+    def _person_embedding(self, person_name: str) -> Optional[np.ndarray]:
+        """计算一个人所有照片的平均特征向量"""
+        embeddings = [embedding for path, embedding in self._file_embeddings.items()
+                      if self._file_person.get(path) == person_name]
+        return np.mean(embeddings, axis=0) if embeddings else None
+
+    def list_image_files(self) -> List[str]:
+        """列出人脸库中的所有图像文件"""
+        if not os.path.isdir(self.known_faces_dir):
+            return []
+        return [path for paths in self._scan_known_faces().values() for path in paths]
+
+    def apply_changes(self, changed: List[str], deleted: List[str]) -> Dict[str, int]:
+        """
+        增量更新人脸库（新增/修改/删除的照片）
+
+        只重新提取受影响照片的特征，完成后整体替换特征矩阵，比对线程不会被阻塞。
+
+        参数:
+            changed: 新增或修改的图像路径
+            deleted: 已删除的图像路径
+
+        返回:
+            {'embedded': 重新提取数, 'removed': 删除数, 'people': 当前人数}
+        """
+        with self._update_lock:
+            affected = set()
+
+            for path in deleted:
+                if path in self._file_embeddings:
+                    del self._file_embeddings[path]
+                    affected.add(self._file_person.pop(path))
+                if self._cache is not None:
+                    self._cache.remove(path)
+
+            changed = [path for path in changed if self._person_for_path(path)]
+            file_embeddings, embedded = self._embed_files(changed)
+            for path in changed:
+                person_name = self._person_for_path(path)
+                old_person = self._file_person.pop(path, None)
+                self._file_embeddings.pop(path, None)
+                if old_person:
+                    affected.add(old_person)
+                if path in file_embeddings:
+                    self._file_embeddings[path] = file_embeddings[path]
+                    self._file_person[path] = person_name
+                    affected.add(person_name)
+
+            known_embeddings = dict(self.known_embeddings)
+            for person_name in affected:
+                embedding = self._person_embedding(person_name)
+                if embedding is None:
+                    known_embeddings.pop(person_name, None)
+                else:
+                    known_embeddings[person_name] = embedding
+
+            self.known_embeddings = known_embeddings
+            self._rebuild_gallery()
+
+            if self._cache is not None:
+                self._cache.save()
+
+            return {'embedded': embedded, 'removed': len(deleted), 'people': len(known_embeddings)}
+
+    def reload(self, known_faces_dir: Optional[str] = None) -> None:
+        """
+        重新加载人脸库（复用已加载的模型权重）
+
+        参数:
+            known_faces_dir: 新的人脸库目录，None表示使用当前目录
+        """
+        with self._update_lock:
+            if known_faces_dir:
+                self.known_faces_dir = known_faces_dir
+            self._file_embeddings = {}
+            self._file_person = {}
+            self._load_known_faces()
+
+    @staticmethod
+    def _load_image(img_path: str) -> Optional[np.ndarray]:
+        """解码图像文件并缩放为 160x160 RGB数组，失败返回None"""
         try:
-            embedding = self._extract_embedding(img_path)
-            if embedding is not None:
-                self.known_embeddings[person_name] = embedding
-                print(f"已加载 {person_name} 的照片特征")
+            img = Image.open(img_path).convert('RGB').resize((160, 160))
+            return np.array(img)
         except Exception as e:
-            print(f"加载图像 {img_path} 失败: {e}")
-
-    def _extract_embedding(self, img_path: str) -> Optional[np.ndarray]:
-        """从图像文件提取特征向量"""
-        img = Image.open(img_path).convert('RGB').resize((160, 160))
-        img_tensor = torch.tensor(np.array(img)).permute(2, 0, 1).float().unsqueeze(0)
-        return self.resnet(img_tensor).detach().numpy()
-        
+            print(f"  警告: 加载 {img_path} 失败: {e}")
+            return None
+
+    def _embed_files(self, paths: List[str],
+                     progress_callback: Optional[Callable[[int, int], None]] = None
+                     ) -> Tuple[Dict[str, np.ndarray], int]:
+        """
+        提取一组图像文件的特征向量
+
+        缓存命中的文件直接复用；其余文件在线程池中并行解码，按批送入FaceNet。
+
+        返回:
+            (路径 -> 特征向量 (1, 512), 重新提取的数量)
+        """
+        results: Dict[str, np.ndarray] = {}
+        pending = []
+        for path in paths:
+            embedding = self._cache.get(path) if self._cache is not None else None
+            if embedding is not None:
+                results[path] = embedding
+            else:
+                pending.append(path)
+
+        total = len(paths)
+        done = len(results)
+        if progress_callback:
+            progress_callback(done, total)
+
+        embedded = 0
+        batch_paths: List[str] = []
+        batch_images: List[np.ndarray] = []
+
+        def flush() -> None:
+            nonlocal embedded
+            if not batch_images:
+                return
+            embeddings = self._forward(np.stack(batch_images))
+            for i, path in enumerate(batch_paths):
+                # 解码后被删除的文件不再入库（下次轮询会作为删除处理）
+                if self._cache is not None and not self._cache.put(path, embeddings[i:i + 1]):
+                    continue
+                results[path] = embeddings[i:i + 1]
+            embedded += len(batch_paths)
+            batch_paths.clear()
+            batch_images.clear()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            # 解码在线程池中进行，与主线程的FaceNet推理重叠
+            for path, image in zip(pending, executor.map(self._load_image, pending)):
+                done += 1
+                if image is not None:
+                    batch_paths.append(path)
+                    batch_images.append(image)
+                    if len(batch_images) >= self.batch_size:
+                        flush()
+                if progress_callback:
+                    progress_callback(done, total)
+            flush()
+
+        return results, embedded
+
+    def _forward(self, batch: np.ndarray) -> np.ndarray:
+        """160x160 RGB图像批次 (N, 160, 160, 3) → 特征矩阵 (N, 512)"""
+        return self.backend.run(batch.transpose(0, 3, 1, 2).astype(np.float32))
+
+    def _preprocess(self, face_img: np.ndarray) -> np.ndarray:
+        """BGR人脸图像 → 160x160 RGB数组"""
+        face_pil = Image.fromarray(cv2.cvtColor(face_img, cv2.COLOR_BGR2RGB)).resize((160, 160))
+        return np.array(face_pil)
+
+    def preprocess_faces(self, face_imgs: List[np.ndarray]) -> np.ndarray:
+        """BGR人脸图像列表 → 160x160 RGB批次 (N, 160, 160, 3)"""
+        return np.stack([self._preprocess(face_img) for face_img in face_imgs])
+
+    def embed_preprocessed(self, batch: np.ndarray) -> np.ndarray:
+        """预处理后的批次 (N, 160, 160, 3) → 特征矩阵 (N, 512)"""
+        return self._forward(batch)
+
+    def get_embeddings(self, face_imgs: List[np.ndarray]) -> np.ndarray:
+        """
+        批量获取人脸特征向量（所有人脸合并为一次前向推理）
+
+        参数:
+            face_imgs: 人脸图像列表(BGR格式)，可来自同一帧或多个摄像头
+
+        返回:
+            特征矩阵，形状为 (N, 512)，行顺序与输入一致
+        """
+        if not face_imgs:
+            return np.empty((0, 512), dtype=np.float32)
+
+        return self.embed_preprocessed(self.preprocess_faces(face_imgs))
+
+    def warmup(self) -> None:
+        """用空白人脸执行一次推理，避免首次识别时的初始化延迟"""
+        self._forward(np.zeros((1, 160, 160, 3), dtype=np.uint8))
+
     def get_embedding(self, face_img: np.ndarray) -> np.ndarray:
         """
         获取人脸图像的特征向量
-        
+
         参数:
             face_img: 人脸图像(BGR格式)
-            
+
         返回:
             人脸特征向量
         """
-        face_pil = Image.fromarray(cv2.cvtColor(face_img, cv2.COLOR_BGR2RGB)).resize((160, 160))
-        face_tensor = torch.tensor(np.array(face_pil)).permute(2, 0, 1).float().unsqueeze(0)
-        return self.resnet(face_tensor).detach().numpy()
-        
+        return self.get_embeddings([face_img])
+
+    def _rebuild_gallery(self) -> None:
+        """根据 known_embeddings 重建归一化特征矩阵（仅在人脸库变化时调用）"""
+        known_embeddings = self.known_embeddings
+        names = list(known_embeddings.keys())
+        if names:
+            matrix = np.stack([
+                np.asarray(known_embeddings[name], dtype=np.float32).reshape(-1) for name in names
+            ])
+            matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+        else:
+            matrix = np.empty((0, 512), dtype=np.float32)
+        # 整体替换元组，比对线程读取到的人名与矩阵始终一致
+        self._gallery = (names, np.ascontiguousarray(matrix))
+
+    def match(self, embeddings: np.ndarray, top_k: int = 1) -> List[List[Tuple[str, float]]]:
+        """
+        批量与人脸库比对（一次矩阵乘法）
+
+        参数:
+            embeddings: 待比对特征向量，形状为 (512,)、(1, 512) 或 (N, 512)
+            top_k: 每个查询返回的候选数
+
+        返回:
+            每个查询的候选列表 [(人名, 余弦相似度), ...]，按相似度降序
+        """
+        names, matrix = self._gallery
+        queries = np.asarray(embeddings, dtype=np.float32).reshape(-1, matrix.shape[1])
+        if not names or top_k <= 0:
+            return [[] for _ in range(len(queries))]
+
+        queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        scores = queries @ matrix.T
+
+        k = min(top_k, len(names))
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row, candidates in zip(scores, top):
+            order = candidates[np.argsort(-row[candidates])]
+            results.append([(names[i], float(row[i])) for i in order])
+        return results
+
+    def compare_faces_batch(self, embeddings: np.ndarray,
+                            threshold: float = 0.7) -> List[Tuple[Optional[str], float]]:
+        """
+        批量与已知人脸比对
+
+        参数:
+            embeddings: 待比对特征矩阵 (N, 512)
+            threshold: 相似度阈值
+
+        返回:
+            每个查询的 (匹配的人名, 最高相似度)
+        """
+        results = []
+        for candidates in self.match(embeddings, top_k=1):
+            if not candidates or candidates[0][1] <= 0.0:
+                results.append((None, 0.0))
+                continue
+            name, similarity = candidates[0]
+            results.append((name if similarity > threshold else None, similarity))
+        return results
+
     def compare_faces(self, embedding: np.ndarray, threshold: float = 0.7) -> Tuple[Optional[str], float]:
         """
         与已知人脸比对
-        
+
         参数:
             embedding: 待比对人脸特征向量
             threshold: 相似度阈值
-            
+
         返回:
             (匹配的人名, 最高相似度)
         """
-        best_match = None
-        best_similarity = 0.0
-        
-        for name, known_embedding in self.known_embeddings.items():
-            similarity = np.dot(embedding, known_embedding.T) / (
-                np.linalg.norm(embedding) * np.linalg.norm(known_embedding))
-                
-            if similarity > best_similarity:
-                best_similarity = similarity
-                best_match = name if similarity > threshold else None
-                
-        return best_match, best_similarity
\ No newline at end of file
+        return self.compare_faces_batch(embedding, threshold)[0]
+
+
+class KnownFacesWatcher:
+    """人脸库目录监控器 - 轮询检测照片的增删改并增量更新识别器"""
+
+    def __init__(self, recognizer: FaceRecognizer, interval: float = 2.0,
+                 on_update: Optional[Callable[[Dict[str, int]], None]] = None):
+        """
+        初始化监控器
+
+        参数:
+            recognizer: 要更新的人脸识别器
+            interval: 轮询间隔（秒）
+            on_update: 人脸库更新后的回调，参数为 apply_changes 的返回值
+        """
+        self.recognizer = recognizer
+        self.interval = interval
+        self.on_update = on_update
+        self._snapshot: Dict[str, Tuple[int, int]] = {}
+        self._pending_dir: Optional[str] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _take_snapshot(self) -> Dict[str, Tuple[int, int]]:
+        """记录人脸库所有图像文件的 (大小, 修改时间)"""
+        snapshot = {}
+        for path in self.recognizer.list_image_files():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            snapshot[path] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def start(self) -> None:
+        """启动后台轮询线程"""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="KnownFacesWatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止轮询线程"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def change_directory(self, known_faces_dir: str) -> None:
+        """切换人脸库目录（在后台线程中重新加载）"""
+        self._pending_dir = known_faces_dir
+
+    def _run(self) -> None:
+        """轮询循环"""
+        # 以识别器当前已加载的照片为基准，启动前后发生的变化也能被捕获
+        current = self._take_snapshot()
+        self._snapshot = {path: current.get(path, (-1, -1)) for path in self.recognizer._file_embeddings}
+
+        while not self._stop_event.is_set():
+            try:
+                if self._pending_dir is not None:
+                    new_dir, self._pending_dir = self._pending_dir, None
+                    self.recognizer.reload(new_dir)
+                    self._snapshot = self._take_snapshot()
+                    if self.on_update:
+                        self.on_update({'embedded': self.recognizer.load_stats.get('embedded', 0),
+                                        'removed': 0, 'people': len(self.recognizer.known_embeddings)})
+                else:
+                    self.check_for_changes()
+            except Exception as e:
+                print(f"人脸库更新失败: {e}")
+
+            self._stop_event.wait(self.interval)
+
+    def check_for_changes(self) -> Optional[Dict[str, int]]:
+        """
+        检查人脸库变化并应用到识别器
+
+        返回:
+            有变化时返回 apply_changes 的结果，否则返回None
+        """
+        snapshot = self._take_snapshot()
+        changed = [path for path, sig in snapshot.items() if self._snapshot.get(path) != sig]
+        deleted = [path for path in self._snapshot if path not in snapshot]
+
+        if not changed and not deleted:
+            self._snapshot = snapshot
+            return None
+
+        # 应用成功后才更新快照，失败时下次轮询重新应用这批变化
+        result = self.recognizer.apply_changes(changed, deleted)
+        self._snapshot = snapshot
+        result['changed'] = len(changed)
+        if self.on_update:
+            self.on_update(result)
+        return result
@@ -0,0 +1,148 @@
+import math
+import time
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+
+@dataclass
+class _CameraSchedule:
+    """单个摄像头的调度状态"""
+    skip: int
+    counter: int = 0
+    last_frame_time: float = 0.0
+    frame_interval: float = 0.0  # 帧到达间隔（EMA，秒）
+    cost: float = 0.0            # 单帧处理耗时（EMA，秒）
+    last_face_time: float = 0.0  # 最近一次画面中有人脸的时间
+    processed: int = 0
+    skipped: int = 0
+
+
+class FrameScheduler:
+    """
+    按摄像头的帧调度器
+
+    固定模式下每个摄像头每N帧处理一次；自适应模式下根据目标延迟、CPU预算和画面活动
+    为每个摄像头动态选择跳帧数：
+    - 有人脸或刚出现人脸时尽量少跳帧（受CPU预算限制）
+    - 画面持续为空时逐步放慢，但保证新出现的人在目标延迟内被处理
+    """
+
+    def __init__(self, frame_skip: int = 3, adaptive: bool = False,
+                 target_latency: float = 0.5, cpu_budget: float = 0.5,
+                 max_skip: int = 15, idle_after: float = 5.0, smoothing: float = 0.2):
+        """
+        初始化调度器
+
+        参数:
+            frame_skip: 固定跳帧数（自适应模式下作为初始值）
+            adaptive: 是否启用自适应调度
+            target_latency: 目标端到端延迟（秒），人物出现到完成判定的最长时间
+            cpu_budget: 推理占用的时间预算（0-1），由所有摄像头平分
+            max_skip: 自适应模式下的最大跳帧数
+            idle_after: 画面无人脸持续多久（秒）后开始降速
+            smoothing: 耗时与帧间隔EMA的平滑系数
+        """
+        self.frame_skip = max(1, frame_skip)
+        self.adaptive = adaptive
+        self.target_latency = target_latency
+        self.cpu_budget = cpu_budget
+        self.max_skip = max(1, max_skip)
+        self.idle_after = idle_after
+        self.smoothing = smoothing
+        self._cameras: Dict[int, _CameraSchedule] = {}
+        self._lock = threading.Lock()
+
+    def _state(self, camera_idx: int) -> _CameraSchedule:
+        state = self._cameras.get(camera_idx)
+        if state is None:
+            state = _CameraSchedule(skip=self.frame_skip, last_face_time=time.time())
+            self._cameras[camera_idx] = state
+        return state
+
+    def _ema(self, old: float, new: float) -> float:
+        return new if old <= 0 else old + self.smoothing * (new - old)
+
+    def should_process(self, camera_idx: int, now: Optional[float] = None) -> bool:
+        """
+        新帧到达时调用，决定该帧是否处理
+
+        参数:
+            camera_idx: 摄像头索引
+            now: 当前时间（默认 time.time()）
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            state = self._state(camera_idx)
+            if state.last_frame_time > 0:
+                state.frame_interval = self._ema(state.frame_interval, now - state.last_frame_time)
+            state.last_frame_time = now
+
+            state.counter += 1
+            if state.counter % state.skip == 0:
+                state.counter = 0
+                state.processed += 1
+                return True
+            state.skipped += 1
+            return False
+
+    def record(self, camera_idx: int, elapsed: float, faces: int, now: Optional[float] = None) -> None:
+        """
+        记录一次处理结果，并在自适应模式下调整跳帧数
+
+        参数:
+            camera_idx: 摄像头索引
+            elapsed: 本帧处理耗时（秒）
+            faces: 当前画面中的人脸（跟踪对象）数
+            now: 当前时间（默认 time.time()）
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            state = self._state(camera_idx)
+            state.cost = self._ema(state.cost, elapsed)
+            if faces > 0:
+                state.last_face_time = now
+
+            if self.adaptive:
+                state.skip = self._choose_skip(state, now)
+
+    def _choose_skip(self, state: _CameraSchedule, now: float) -> int:
+        """根据CPU预算、目标延迟和画面活动选择跳帧数"""
+        if state.frame_interval <= 0:
+            return state.skip
+        fps = 1.0 / state.frame_interval
+
+        # CPU预算下限: cost * fps / skip <= 单摄像头预算
+        budget = self.cpu_budget / max(1, len(self._cameras))
+        min_skip = max(1, math.ceil(state.cost * fps / budget)) if budget > 0 else self.max_skip
+
+        # 延迟上限: skip * 帧间隔 + 处理耗时 <= 目标延迟
+        latency_skip = max(1, int((self.target_latency - state.cost) * fps))
+
+        if now - state.last_face_time < self.idle_after:
+            # 有人或刚有人：尽量快
+            skip = min_skip
+        else:
+            # 画面空闲：在延迟允许的范围内放慢
+            skip = max(min_skip, min(latency_skip, self.max_skip))
+
+        return min(max(1, skip), max(self.max_skip, min_skip))
+
+    def rates(self) -> Dict[int, Dict[str, float]]:
+        """
+        获取各摄像头当前的调度状态
+
+        返回:
+            {camera_idx: {'skip': 跳帧数, 'fps': 处理帧率, 'cost_ms': 单帧耗时, 'processed': .., 'skipped': ..}}
+        """
+        with self._lock:
+            return {
+                camera_idx: {
+                    'skip': state.skip,
+                    'fps': (1.0 / (state.frame_interval * state.skip)) if state.frame_interval > 0 else 0.0,
+                    'cost_ms': state.cost * 1000,
+                    'processed': state.processed,
+                    'skipped': state.skipped,
+                }
+                for camera_idx, state in self._cameras.items()
+            }
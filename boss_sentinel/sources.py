@@ -0,0 +1,232 @@
+"""
+帧来源
+
+除摄像头外，还支持视频文件、图像目录和合成画面，便于在没有摄像头的机器上
+用录制素材对整条流水线做性能分析和回归测试。
+
+所有来源都实现 cv2.VideoCapture 的 isOpened()/read()/release() 接口，可直接交给 CameraReader。
+
+来源描述（配置中 cameras 列表的元素）:
+- 0, 1, "0"            摄像头设备索引
+- "rtsp://..."         网络视频流
+- "clips/office.mp4"   视频文件
+- "clips/frames/"      图像目录（按文件名排序）
+- "synthetic"          合成画面，可写作 "synthetic:640x480:2" (分辨率:移动方块数)
+"""
+import os
+import time
+import cv2
+import numpy as np
+from typing import Callable, List, Optional, Tuple, Union
+
+PACING_MODES = ("realtime", "fast")
+FRAME_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+
+class FrameSource:
+    """
+    离线帧来源基类
+
+    realtime 模式按帧率节流，模拟真实摄像头；fast 模式不等待，CameraReader 会等上一帧
+    被取走后再读取下一帧，因此不会丢帧，处理速度即为流水线的最大吞吐。
+    """
+
+    def __init__(self, fps: float = 25.0, pacing: str = "realtime", loop: bool = False):
+        """
+        参数:
+            fps: 帧率（realtime 模式下的节流速度）
+            pacing: "realtime" 或 "fast"
+            loop: 读完后是否从头循环
+        """
+        if pacing not in PACING_MODES:
+            raise ValueError(f"未知的节流模式: {pacing}")
+        self.fps = fps if fps and fps > 0 else 25.0
+        self.realtime = pacing == "realtime"
+        self.loop = loop
+        self.finished = False  # 非循环来源读完后为True
+        self.frames_read = 0
+        self._next_time = 0.0
+
+    def isOpened(self) -> bool:
+        return True
+
+    def _read_frame(self) -> Optional[np.ndarray]:
+        """读取下一帧，没有更多帧时返回None"""
+        raise NotImplementedError
+
+    def _rewind(self) -> bool:
+        """回到开头，不支持时返回False"""
+        return False
+
+    def _pace(self) -> None:
+        """realtime 模式下等待到下一帧的时间点"""
+        if not self.realtime:
+            return
+        now = time.perf_counter()
+        if self._next_time > now:
+            time.sleep(self._next_time - now)
+            now = self._next_time
+        # 落后时不追帧，从当前时间重新计时
+        self._next_time = now + 1.0 / self.fps
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if self.finished:
+            return False, None
+
+        frame = self._read_frame()
+        if frame is None and self.loop and self._rewind():
+            frame = self._read_frame()
+        if frame is None:
+            self.finished = True
+            return False, None
+
+        self._pace()
+        self.frames_read += 1
+        return True, frame
+
+    def release(self) -> None:
+        pass
+
+
+class VideoFileSource(FrameSource):
+    """视频文件来源（帧率取自文件）"""
+
+    def __init__(self, path: str, pacing: str = "realtime", loop: bool = False):
+        self.path = path
+        self.capture = cv2.VideoCapture(path)
+        super().__init__(self.capture.get(cv2.CAP_PROP_FPS), pacing, loop)
+
+    def isOpened(self) -> bool:
+        return self.capture.isOpened()
+
+    def _read_frame(self) -> Optional[np.ndarray]:
+        ret, frame = self.capture.read()
+        return frame if ret else None
+
+    def _rewind(self) -> bool:
+        return self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def release(self) -> None:
+        self.capture.release()
+
+
+class ImageDirectorySource(FrameSource):
+    """图像目录来源（按文件名排序逐张读取）"""
+
+    def __init__(self, directory: str, fps: float = 25.0, pacing: str = "realtime", loop: bool = False):
+        super().__init__(fps, pacing, loop)
+        self.directory = directory
+        self.paths: List[str] = sorted(
+            entry.path for entry in os.scandir(directory)
+            if entry.is_file() and entry.name.lower().endswith(FRAME_EXTENSIONS)
+        ) if os.path.isdir(directory) else []
+        self._index = 0
+
+    def isOpened(self) -> bool:
+        return bool(self.paths)
+
+    def _read_frame(self) -> Optional[np.ndarray]:
+        while self._index < len(self.paths):
+            frame = cv2.imread(self.paths[self._index])
+            self._index += 1
+            if frame is not None:
+                return frame
+        return None
+
+    def _rewind(self) -> bool:
+        self._index = 0
+        return bool(self.paths)
+
+
+class SyntheticSource(FrameSource):
+    """
+    合成画面来源
+
+    默认生成带噪声背景和若干移动亮色方块的画面；也可传入 generator(帧序号) -> BGR帧 自定义内容。
+    """
+
+    def __init__(self, width: int = 640, height: int = 480, objects: int = 1, frames: int = 0,
+                 fps: float = 25.0, pacing: str = "realtime",
+                 generator: Optional[Callable[[int], np.ndarray]] = None, seed: int = 0):
+        """
+        参数:
+            width, height: 画面尺寸
+            objects: 移动方块数
+            frames: 总帧数，0表示无限
+            fps: 帧率
+            pacing: "realtime" 或 "fast"
+            generator: 自定义帧生成函数
+            seed: 随机种子（保证可复现）
+        """
+        super().__init__(fps, pacing, loop=False)
+        self.width = width
+        self.height = height
+        self.objects = objects
+        self.frames = frames
+        self.generator = generator
+        self._index = 0
+        rng = np.random.default_rng(seed)
+        self._background = rng.integers(0, 40, (height, width, 3), dtype=np.uint8)
+        size = max(8, min(width, height) // 5)
+        self._boxes = [
+            (rng.uniform(0, width - size), rng.uniform(0, height - size), rng.uniform(-4, 4), rng.uniform(-3, 3), size)
+            for _ in range(objects)
+        ]
+
+    def _read_frame(self) -> Optional[np.ndarray]:
+        if self.frames and self._index >= self.frames:
+            return None
+        index = self._index
+        self._index += 1
+        if self.generator is not None:
+            return self.generator(index)
+
+        frame = self._background.copy()
+        for x, y, vx, vy, size in self._boxes:
+            # 在画面内来回反弹
+            span_x, span_y = max(1, self.width - size), max(1, self.height - size)
+            px = int(abs((x + vx * index) % (2 * span_x) - span_x))
+            py = int(abs((y + vy * index) % (2 * span_y) - span_y))
+            frame[py:py + size, px:px + size] = 200
+        return frame
+
+
+def parse_source(value: str) -> Union[int, str]:
+    """将文本形式的来源（如GUI输入）转换为配置值：纯数字视为摄像头索引"""
+    value = value.strip()
+    return int(value) if value.isdigit() else value
+
+
+def open_source(spec: Union[int, str], pacing: str = "realtime", fps: float = 25.0, loop: bool = False):
+    """
+    按来源描述打开帧来源
+
+    参数:
+        spec: 来源描述，见模块说明
+        pacing: 离线来源的节流模式，"realtime" 或 "fast"（摄像头与网络流始终为实时）
+        fps: 图像目录与合成画面的帧率
+        loop: 视频文件与图像目录读完后是否循环
+
+    返回:
+        cv2.VideoCapture 或 FrameSource
+    """
+    if isinstance(spec, int):
+        return cv2.VideoCapture(spec)
+
+    spec = str(spec)
+    if spec.isdigit():
+        return cv2.VideoCapture(int(spec))
+
+    if spec == "synthetic" or spec.startswith("synthetic:"):
+        parts = spec.split(":")[1:]
+        width, height = (int(v) for v in parts[0].split("x")) if parts and parts[0] else (640, 480)
+        objects = int(parts[1]) if len(parts) > 1 else 1
+        return SyntheticSource(width, height, objects, fps=fps, pacing=pacing)
+
+    if "://" in spec:
+        return cv2.VideoCapture(spec)
+
+    if os.path.isdir(spec):
+        return ImageDirectorySource(spec, fps, pacing, loop)
+
+    return VideoFileSource(spec, pacing, loop)
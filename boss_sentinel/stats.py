@@ -0,0 +1,208 @@
+import time
+import bisect
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+# 直方图桶上界（秒）：0.1ms 起按2倍递增到约13秒，最后一个桶为 +Inf
+LATENCY_BUCKETS: Tuple[float, ...] = tuple(round(0.0001 * 2 ** i, 7) for i in range(18))
+
+
+class LatencyHistogram:
+    """固定桶的耗时直方图（可直接导出为Prometheus直方图）"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """记录一次耗时"""
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q: float) -> float:
+        """
+        按桶估算分位数（桶内线性插值）
+
+        参数:
+            q: 分位数(0-100)
+
+        返回:
+            耗时（秒），没有数据时为0
+        """
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        cumulative = 0
+        for i, bucket_count in enumerate(self.counts):
+            if bucket_count and cumulative + bucket_count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                return min(lower + (upper - lower) * (rank - cumulative) / bucket_count, self.max)
+            cumulative += bucket_count
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        """耗时摘要（毫秒）"""
+        return {
+            'count': self.count,
+            'mean_ms': self.sum / self.count * 1000 if self.count else 0.0,
+            'p50_ms': self.percentile(50) * 1000,
+            'p95_ms': self.percentile(95) * 1000,
+            'p99_ms': self.percentile(99) * 1000,
+            'max_ms': self.max * 1000,
+        }
+
+    def cumulative_counts(self) -> List[Tuple[float, int]]:
+        """累计计数 [(桶上界, 计数), ...]，最后一项上界为 inf"""
+        result = []
+        total = 0
+        for bound, bucket_count in zip(list(self.buckets) + [float('inf')], self.counts):
+            total += bucket_count
+            result.append((bound, total))
+        return result
+
+
+class _Timer:
+    """计时上下文：退出时把耗时记入统计"""
+
+    __slots__ = ('_stats', '_stage', '_camera_idx', '_start')
+
+    def __init__(self, stats: "StatsCollector", stage: str, camera_idx: int):
+        self._stats = stats
+        self._stage = stage
+        self._camera_idx = camera_idx
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._stats.record(self._stage, self._camera_idx, time.perf_counter() - self._start)
+        return False
+
+
+class _NullTimer:
+    """关闭统计时使用的空计时器"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class StatsCollector:
+    """
+    热路径统计 - 按摄像头的阶段耗时直方图与计数器
+
+    关闭时所有记录方法只做一次布尔判断后返回，计时器为共享的空对象，开销可忽略。
+    """
+
+    # 阶段: capture 为帧从采集到开始处理的等待时间，其余为各步骤自身耗时
+    STAGES = ("capture", "detect", "crop", "preprocess", "embed", "match", "lock")
+    COUNTERS = ("frames_seen", "frames_skipped", "frames_detected", "faces_embedded", "matches")
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._latency: Dict[Tuple[str, int], LatencyHistogram] = {}
+        self._counters: Dict[Tuple[str, int], int] = {}
+
+    def time(self, stage: str, camera_idx: int):
+        """
+        计时上下文
+
+        用法:
+            with stats.time("detect", camera_idx):
+                ...
+        """
+        return _Timer(self, stage, camera_idx) if self.enabled else _NULL_TIMER
+
+    def record(self, stage: str, camera_idx: int, seconds: float) -> None:
+        """记录一次阶段耗时（秒）"""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._latency.get((stage, camera_idx))
+            if histogram is None:
+                histogram = self._latency[(stage, camera_idx)] = LatencyHistogram()
+            histogram.observe(seconds)
+
+    def record_shared(self, stage: str, owners: Iterable[int], seconds: float) -> None:
+        """
+        记录多个摄像头共享的一次批处理耗时，按条目平摊到各摄像头
+
+        参数:
+            owners: 每个条目所属的摄像头（如每张人脸裁剪图的摄像头）
+        """
+        if not self.enabled:
+            return
+        owners = list(owners)
+        if not owners:
+            return
+        shares: Dict[int, int] = {}
+        for camera_idx in owners:
+            shares[camera_idx] = shares.get(camera_idx, 0) + 1
+        for camera_idx, share in shares.items():
+            self.record(stage, camera_idx, seconds * share / len(owners))
+
+    def count(self, name: str, camera_idx: int, n: int = 1) -> None:
+        """计数器加n"""
+        if not self.enabled:
+            return
+        with self._lock:
+            key = (name, camera_idx)
+            self._counters[key] = self._counters.get(key, 0) + n
+
+    def histograms(self) -> Dict[Tuple[str, int], LatencyHistogram]:
+        """直方图快照 {(阶段, 摄像头): 直方图}（浅拷贝，供导出使用）"""
+        with self._lock:
+            snapshot = {}
+            for key, histogram in self._latency.items():
+                copy = LatencyHistogram(histogram.buckets)
+                copy.counts = list(histogram.counts)
+                copy.count, copy.sum, copy.max = histogram.count, histogram.sum, histogram.max
+                snapshot[key] = copy
+            return snapshot
+
+    def counters(self) -> Dict[Tuple[str, int], int]:
+        """计数器快照 {(名称, 摄像头): 计数}"""
+        with self._lock:
+            return dict(self._counters)
+
+    def snapshot(self) -> Dict[str, object]:
+        """
+        获取统计快照
+
+        返回:
+            {'enabled': .., 'uptime': 秒, 'cameras': {camera_idx: {'counters': {..}, 'latency': {阶段: 摘要}}}}
+        """
+        cameras: Dict[int, Dict[str, Dict]] = {}
+        for (name, camera_idx), value in self.counters().items():
+            cameras.setdefault(camera_idx, {'counters': {}, 'latency': {}})['counters'][name] = value
+        for (stage, camera_idx), histogram in self.histograms().items():
+            cameras.setdefault(camera_idx, {'counters': {}, 'latency': {}})['latency'][stage] = histogram.summary()
+        return {
+            'enabled': self.enabled,
+            'uptime': time.time() - self.started,
+            'cameras': cameras,
+        }
+
+    def reset(self) -> None:
+        """清空所有统计"""
+        with self._lock:
+            self._latency.clear()
+            self._counters.clear()
+            self.started = time.time()
@@ -1,5 +1,5 @@
 import numpy as np
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 import time
 
@@ -12,21 +12,41 @@ class Track:
     similarity: float = 0.0
     last_seen: float = 0.0
     confidence: float = 0.0
+    verified_frame: int = -1  # 最近一次身份识别时的帧序号，-1表示尚未识别
+    verified_bbox: Optional[Tuple[float, float, float, float]] = None  # 最近一次识别时的边界框
+    last_frame: int = 0  # 最近一次匹配到检测框的帧序号
+    observed_bbox: Optional[Tuple[float, float, float, float]] = None  # 最近一次检测到的边界框
+    velocity: Tuple[float, float, float, float] = (0.0, 0.0, 0.0, 0.0)  # 每帧边界框位移
+
+    @property
+    def resolved(self) -> bool:
+        """是否已完成身份识别（包括识别为陌生人）"""
+        return self.verified_frame >= 0
 
 class FaceTracker:
     """轻量级人脸跟踪器"""
 
-    def __init__(self, max_disappeared: int = 30, iou_threshold: float = 0.3):
+    MOTION_MODELS = ("none", "constant_velocity")
+
+    def __init__(self, max_disappeared: int = 30, iou_threshold: float = 0.3,
+                 motion_model: str = "none", velocity_smoothing: float = 0.5):
         """
         初始化跟踪器
 
         参数:
-            max_disappeared: 目标消失的最大帧数
+            max_disappeared: 目标消失的最大帧数（update()与predict()均计为一帧）
             iou_threshold: IoU阈值，用于匹配检测框
+            motion_model: 运动模型，"none" 保持上次位置，"constant_velocity" 按恒速外推
+            velocity_smoothing: 速度估计的平滑系数(0-1)，越大越信任最新观测
         """
+        if motion_model not in self.MOTION_MODELS:
+            raise ValueError(f"未知的运动模型: {motion_model}")
         self.max_disappeared = max_disappeared
         self.iou_threshold = iou_threshold
+        self.motion_model = motion_model
+        self.velocity_smoothing = velocity_smoothing
         self.next_id = 0
+        self.frame_index = 0  # update()/predict() 调用次数
         self.tracks: Dict[int, Track] = {}
 
     def _calculate_iou(self, bbox1: Tuple[float, float, float, float],
@@ -53,9 +73,106 @@ class FaceTracker:
 
         return inter_area / union_area if union_area > 0 else 0.0
 
+    @staticmethod
+    def _iou_matrix(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+        """
+        批量计算IoU矩阵
+
+        参数:
+            boxes_a: (N, 4) 边界框数组
+            boxes_b: (M, 4) 边界框数组
+
+        返回:
+            (N, M) IoU矩阵
+        """
+        a = boxes_a[:, np.newaxis, :]
+        b = boxes_b[np.newaxis, :, :]
+
+        inter_w = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+        inter_h = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+        inter_area = inter_w * inter_h
+
+        area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+        area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+        union_area = area_a[:, np.newaxis] + area_b[np.newaxis, :] - inter_area
+
+        return np.divide(inter_area, union_area, out=np.zeros_like(inter_area), where=union_area > 0)
+
+    def _assign(self, track_ids: List[int], detections: list) -> List[Tuple[int, int]]:
+        """
+        最优匹配跟踪对象与检测框（最大化总IoU）
+
+        返回:
+            匹配对列表 [(track_id, det_idx), ...]，IoU低于阈值的不匹配
+        """
+        track_boxes = np.array([self.tracks[track_id].bbox for track_id in track_ids], dtype=np.float64)
+        det_boxes = np.array([det[:4] for det in detections], dtype=np.float64)
+        iou = self._iou_matrix(track_boxes, det_boxes)
+
+        # scipy 导入较慢（数百毫秒），延迟到首次匹配时，保持导入监控/GUI模块轻量
+        from scipy.optimize import linear_sum_assignment
+        rows, cols = linear_sum_assignment(-iou)
+        return [(track_ids[r], int(c)) for r, c in zip(rows, cols) if iou[r, c] >= self.iou_threshold]
+
+    def predict(self) -> Dict[int, Track]:
+        """
+        推进一帧（非关键帧，不运行检测器）
+
+        恒速模型下按估计速度外推边界框；并对长时间未匹配的目标做老化移除。
+
+        返回:
+            当前所有跟踪对象
+        """
+        self.frame_index += 1
+        if self.motion_model == "constant_velocity":
+            for track in self.tracks.values():
+                vx1, vy1, vx2, vy2 = track.velocity
+                x1, y1, x2, y2 = track.bbox
+                track.bbox = (x1 + vx1, y1 + vy1, x2 + vx2, y2 + vy2)
+        self._remove_disappeared()
+        return self.tracks
+
+    def _remove_disappeared(self) -> None:
+        """移除超过 max_disappeared 帧未匹配到检测框的跟踪对象"""
+        for track_id in list(self.tracks.keys()):
+            if self.frame_index - self.tracks[track_id].last_frame > self.max_disappeared:
+                del self.tracks[track_id]
+
+    def _create_track(self, det, current_time: float) -> None:
+        """为检测框创建新跟踪对象"""
+        x1, y1, x2, y2, conf = det
+        self.tracks[self.next_id] = Track(
+            track_id=self.next_id,
+            bbox=(x1, y1, x2, y2),
+            confidence=conf,
+            last_seen=current_time,
+            last_frame=self.frame_index,
+            observed_bbox=(x1, y1, x2, y2),
+        )
+        self.next_id += 1
+
+    def _correct(self, track: Track, det, current_time: float) -> None:
+        """用匹配的检测框校正跟踪对象，并更新速度估计"""
+        x1, y1, x2, y2, conf = det
+        bbox = (x1, y1, x2, y2)
+
+        if self.motion_model == "constant_velocity" and track.observed_bbox is not None:
+            frames = max(1, self.frame_index - track.last_frame)
+            alpha = self.velocity_smoothing
+            track.velocity = tuple(
+                alpha * (new - old) / frames + (1 - alpha) * v
+                for new, old, v in zip(bbox, track.observed_bbox, track.velocity)
+            )
+
+        track.bbox = bbox
+        track.observed_bbox = bbox
+        track.confidence = conf
+        track.last_seen = current_time
+        track.last_frame = self.frame_index
+
     def update(self, detections: list) -> Dict[int, Track]:
         """
-        更新跟踪器
+        更新跟踪器（关键帧，使用检测结果）
 
         参数:
             detections: 检测结果列表，每个元素为 (x1, y1, x2, y2, confidence)
@@ -64,80 +181,85 @@ class FaceTracker:
             当前所有跟踪对象
         """
         current_time = time.time()
+        # 先外推到当前帧，再与检测框匹配
+        self.predict()
 
         if not detections:
-            # 没有检测到任何目标，更新所有跟踪对象的消失时间
-            disappeared = []
-            for track_id in list(self.tracks.keys()):
-                self.tracks[track_id].last_seen = current_time
-                disappeared.append(track_id)
-
-            # 移除长时间未出现的目标
-            for track_id in disappeared:
-                if current_time - self.tracks[track_id].last_seen > self.max_disappeared:
-                    del self.tracks[track_id]
-
             return self.tracks
 
         # 如果之前没有跟踪对象，为所有检测创建新跟踪
         if not self.tracks:
             for det in detections:
-                x1, y1, x2, y2, conf = det
-                self.tracks[self.next_id] = Track(
-                    track_id=self.next_id,
-                    bbox=(x1, y1, x2, y2),
-                    confidence=conf,
-                    last_seen=current_time
-                )
-                self.next_id += 1
+                self._create_track(det, current_time)
             return self.tracks
 
-        # 匹配检测框和现有跟踪对象
+        # 匹配检测框和现有跟踪对象（IoU矩阵 + 匈牙利算法）
         matched_detections = set()
-        matched_tracks = set()
-
-        # 计算检测框和跟踪框之间的IoU矩阵
-        for track_id, track in self.tracks.items():
-            best_iou = 0.0
-            best_det_idx = -1
-
-            for det_idx, det in enumerate(detections):
-                if det_idx in matched_detections:
-                    continue
-
-                iou = self._calculate_iou(track.bbox, det[:4])
-                if iou > best_iou:
-                    best_iou = iou
-                    best_det_idx = det_idx
-
-            # 如果找到匹配的检测框
-            if best_iou >= self.iou_threshold and best_det_idx != -1:
-                x1, y1, x2, y2, conf = detections[best_det_idx]
-                self.tracks[track_id].bbox = (x1, y1, x2, y2)
-                self.tracks[track_id].confidence = conf
-                self.tracks[track_id].last_seen = current_time
-                matched_detections.add(best_det_idx)
-                matched_tracks.add(track_id)
+
+        for track_id, det_idx in self._assign(list(self.tracks.keys()), detections):
+            self._correct(self.tracks[track_id], detections[det_idx], current_time)
+            matched_detections.add(det_idx)
 
         # 为未匹配的检测创建新跟踪
         for det_idx, det in enumerate(detections):
             if det_idx not in matched_detections:
-                x1, y1, x2, y2, conf = det
-                self.tracks[self.next_id] = Track(
-                    track_id=self.next_id,
-                    bbox=(x1, y1, x2, y2),
-                    confidence=conf,
-                    last_seen=current_time
-                )
-                self.next_id += 1
-
-        # 移除长时间未出现的跟踪对象
-        for track_id in list(self.tracks.keys()):
-            if current_time - self.tracks[track_id].last_seen > self.max_disappeared:
-                del self.tracks[track_id]
+                self._create_track(det, current_time)
 
         return self.tracks
 
+    def _box_changed(self, track: Track, max_change: float) -> bool:
+        """边界框相对上次识别时的位移或尺寸变化是否超过阈值"""
+        if track.verified_bbox is None:
+            return True
+
+        x1, y1, x2, y2 = track.bbox
+        vx1, vy1, vx2, vy2 = track.verified_bbox
+        ref_size = max(vx2 - vx1, vy2 - vy1, 1e-6)
+
+        # 中心点位移（相对于原框尺寸）
+        shift = max(abs((x1 + x2) - (vx1 + vx2)), abs((y1 + y2) - (vy1 + vy2))) / 2 / ref_size
+        # 面积变化比例
+        ref_area = max((vx2 - vx1) * (vy2 - vy1), 1e-6)
+        scale = abs((x2 - x1) * (y2 - y1) / ref_area - 1.0)
+
+        return shift > max_change or scale > max_change
+
+    def tracks_to_verify(self, reverify_interval: int = 30, max_box_change: float = 0.5,
+                         limit: int = 0) -> List[Track]:
+        """
+        获取需要（重新）识别身份的跟踪对象
+
+        参数:
+            reverify_interval: 已识别目标的复核间隔（帧），0表示每帧都识别
+            max_box_change: 边界框位移/尺寸变化超过该比例时立即复核
+            limit: 最多返回的数量，0表示不限制
+
+        返回:
+            跟踪对象列表，未识别的目标优先
+        """
+        pending = []
+        for track in self.tracks.values():
+            if not track.resolved:
+                pending.append((0, track))
+            elif (reverify_interval <= 0
+                  or self.frame_index - track.verified_frame >= reverify_interval
+                  or self._box_changed(track, max_box_change)):
+                pending.append((1, track))
+
+        pending.sort(key=lambda item: (item[0], item[1].verified_frame))
+        tracks = [track for _, track in pending]
+        return tracks[:limit] if limit > 0 else tracks
+
+    def set_identity(self, track_id: int, person_name: Optional[str], similarity: float) -> None:
+        """缓存跟踪对象的身份识别结果"""
+        track = self.tracks.get(track_id)
+        if track is None:
+            return
+        track.person_name = person_name
+        track.similarity = similarity
+        track.verified_frame = self.frame_index
+        track.verified_bbox = track.bbox
+
     def get_track_by_id(self, track_id: int) -> Optional[Track]:
         """根据ID获取跟踪对象"""
         return self.tracks.get(track_id)
@@ -146,3 +268,4 @@ class FaceTracker:
         """重置跟踪器"""
         self.tracks.clear()
         self.next_id = 0
+        self.frame_index = 0
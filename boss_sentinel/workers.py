@@ -0,0 +1,267 @@
+import time
+import queue
+import dataclasses
+import multiprocessing
+import numpy as np
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .config import SentinelConfig
+
+
+@dataclass
+class WorkerResult:
+    """工作进程返回的一帧处理结果"""
+    camera_idx: int
+    seq: int
+    elapsed: float  # 处理耗时（秒）
+    faces: int      # 当前跟踪对象数
+    matches: List[Tuple[str, float]] = field(default_factory=list)  # [(人名, 相似度), ...]
+
+
+class SharedFrameSlot:
+    """
+    单个摄像头的共享内存帧槽
+
+    协调进程把帧写入共享内存，工作进程直接在共享内存上构造ndarray视图，
+    帧数据不经过pickle/管道复制。每个摄像头同一时刻最多一帧在处理中，因此单槽即可。
+    """
+
+    def __init__(self, shape: Tuple[int, ...], dtype=np.uint8):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        size = max(1, int(np.prod(self.shape)) * self.dtype.itemsize)
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=self.shm.buf)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def write(self, frame: np.ndarray) -> None:
+        """将帧复制到共享内存"""
+        np.copyto(self.array, frame)
+
+    def close(self) -> None:
+        """释放共享内存"""
+        del self.array
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _worker_config(config: SentinelConfig) -> SentinelConfig:
+    """
+    工作进程使用的配置
+
+    摄像头、跳帧、通知、流水线与日志轮转均由协调进程负责，工作进程只做检测与识别。
+    """
+    return dataclasses.replace(
+        config, cameras=[], frame_skip=1, adaptive_skip=False, notification_email=None,
+        pipeline=False, worker_processes=0, show_feed=False, log_max_bytes=0, log_rotate_interval=0.0,
+    )
+
+
+def _worker_main(worker_id: int, config: SentinelConfig,
+                 jobs: "multiprocessing.Queue", results: "multiprocessing.Queue",
+                 model_factory: Optional[Callable[[], Tuple]] = None) -> None:
+    """工作进程入口：加载模型（或由 model_factory 创建），循环处理协调进程分发的帧"""
+    from .monitor import SentinelMonitor
+
+    class WorkerMonitor(SentinelMonitor):
+        """命中结果不在工作进程中处理，收集后交给协调进程"""
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.matches: List[Tuple[int, str, float]] = []
+
+        def _on_match(self, person_name: str, similarity: float, camera_idx: int) -> None:
+            self.matches.append((camera_idx, person_name, float(similarity)))
+
+    detector, recognizer = model_factory() if model_factory else (None, None)
+    monitor = WorkerMonitor(_worker_config(config), lazy_load=True, detector=detector, recognizer=recognizer)
+    monitor.initialize_models()
+    results.put(('ready', worker_id, monitor.startup_timings))
+
+    attached: Dict[int, Tuple[shared_memory.SharedMemory, np.ndarray]] = {}
+    try:
+        while True:
+            job = jobs.get()
+            if job is None:
+                break
+
+            # 队列中积压的帧（同组的其他摄像头）合并为一次批量处理
+            batch = [job]
+            while True:
+                try:
+                    job = jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    jobs.put(None)
+                    break
+                batch.append(job)
+
+            frames = []
+            for camera_idx, shm_name, shape, dtype, _ in batch:
+                shm, frame = attached.get(camera_idx, (None, None))
+                if shm is None or shm.name != shm_name:
+                    # 帧尺寸变化时协调进程会换用新的共享内存
+                    if shm is not None:
+                        del frame
+                        shm.close()
+                    shm = shared_memory.SharedMemory(name=shm_name)
+                    frame = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+                    attached[camera_idx] = (shm, frame)
+                frames.append((camera_idx, frame))
+
+            monitor.matches = []
+            start = time.perf_counter()
+            try:
+                monitor._process_batch(frames)
+            except Exception as e:
+                monitor.logger.log(f"Worker {worker_id} processing error: {e}", print_console=True)
+            elapsed = (time.perf_counter() - start) / len(frames)
+
+            # 无论成功与否都回报，协调进程据此释放帧槽
+            for camera_idx, _, _, _, seq in batch:
+                tracker = monitor.trackers.get(camera_idx)
+                results.put(WorkerResult(
+                    camera_idx=camera_idx,
+                    seq=seq,
+                    elapsed=elapsed,
+                    faces=len(tracker.tracks) if tracker else 0,
+                    matches=[(name, similarity) for idx, name, similarity in monitor.matches
+                             if idx == camera_idx],
+                ))
+    finally:
+        for shm, frame in attached.values():
+            del frame
+            shm.close()
+        monitor.shutdown()
+
+
+class WorkerPool:
+    """
+    多进程工作池（协调进程侧）
+
+    摄像头按轮询分组到各工作进程；每个工作进程独立加载模型，处理本组摄像头的帧。
+    帧通过共享内存传递，队列中只传递共享内存名称与帧形状。
+    """
+
+    def __init__(self, config: SentinelConfig, num_cameras: int, processes: int,
+                 model_factory: Optional[Callable[[], Tuple]] = None):
+        """
+        参数:
+            config: 系统配置
+            num_cameras: 摄像头数量
+            processes: 工作进程数（不超过摄像头数）
+            model_factory: 在工作进程中创建 (检测器, 识别器) 的函数（需可pickle），None表示按配置加载
+        """
+        self.config = config
+        self.model_factory = model_factory
+        self.processes = max(1, min(processes, num_cameras))
+        # 使用spawn方式启动，与Windows行为一致，且不继承协调进程中的线程/CUDA状态
+        self._ctx = multiprocessing.get_context("spawn")
+        self._results = self._ctx.Queue()
+        self._jobs = [self._ctx.Queue() for _ in range(self.processes)]
+        self._workers: List[multiprocessing.Process] = []
+        self._slots: Dict[int, SharedFrameSlot] = {}
+        self._in_flight: Dict[int, int] = {}  # camera_idx -> seq
+        self.ready: Dict[int, Dict[str, float]] = {}  # worker_id -> 启动耗时
+
+    def worker_for(self, camera_idx: int) -> int:
+        """摄像头所属的工作进程"""
+        return camera_idx % self.processes
+
+    def start(self) -> None:
+        """启动所有工作进程"""
+        for worker_id in range(self.processes):
+            process = self._ctx.Process(
+                target=_worker_main,
+                args=(worker_id, self.config, self._jobs[worker_id], self._results, self.model_factory),
+                name=f"sentinel-worker-{worker_id}",
+                daemon=True,
+            )
+            process.start()
+            self._workers.append(process)
+
+    def busy(self, camera_idx: int) -> bool:
+        """摄像头是否有帧正在处理（此时帧槽不可写）"""
+        return camera_idx in self._in_flight
+
+    @property
+    def in_flight(self) -> int:
+        """正在处理中的帧数"""
+        return len(self._in_flight)
+
+    def submit(self, camera_idx: int, frame: np.ndarray, seq: int) -> bool:
+        """
+        提交一帧到对应的工作进程
+
+        返回:
+            False表示该摄像头上一帧尚未处理完，本帧被丢弃
+        """
+        if self.busy(camera_idx):
+            return False
+
+        slot = self._slots.get(camera_idx)
+        if slot is None or slot.shape != frame.shape or slot.dtype != frame.dtype:
+            if slot is not None:
+                slot.close()
+            slot = SharedFrameSlot(frame.shape, frame.dtype)
+            self._slots[camera_idx] = slot
+
+        slot.write(frame)
+        self._in_flight[camera_idx] = seq
+        self._jobs[self.worker_for(camera_idx)].put(
+            (camera_idx, slot.name, slot.shape, slot.dtype.str, seq)
+        )
+        return True
+
+    def results(self, timeout: float = 0.0) -> List[WorkerResult]:
+        """
+        取出已完成的处理结果（首个结果最多等待timeout秒）
+
+        返回:
+            结果列表，可能为空
+        """
+        collected = []
+        block = timeout > 0
+        while True:
+            try:
+                message = self._results.get(block, timeout) if block else self._results.get_nowait()
+            except queue.Empty:
+                break
+            block = False
+
+            if isinstance(message, tuple) and message[0] == 'ready':
+                self.ready[message[1]] = message[2]
+                continue
+
+            self._in_flight.pop(message.camera_idx, None)
+            collected.append(message)
+        return collected
+
+    def alive(self) -> int:
+        """存活的工作进程数"""
+        return sum(1 for process in self._workers if process.is_alive())
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """停止工作进程并释放共享内存"""
+        for jobs in self._jobs:
+            jobs.put(None)
+        deadline = time.time() + timeout
+        for process in self._workers:
+            process.join(max(0.0, deadline - time.time()))
+            if process.is_alive():
+                process.terminate()
+        self._workers.clear()
+
+        for slot in self._slots.values():
+            slot.close()
+        self._slots.clear()
+        self._in_flight.clear()
@@ -17,6 +17,7 @@ setup(
         "ultralytics>=8.0.0",
         "facenet-pytorch>=2.5.0",
         "numpy>=1.21.0",
+        "scipy>=1.7.0",
         "schedule>=1.1.0",
         "torch>=1.10.0",
         "torchvision>=0.11.0",
@@ -0,0 +1,188 @@
+"""
+邮件通知测试
+
+使用本地SMTP替身（仅实现发信所需的命令），通过 smtp_factory 和 use_tls=False 连接，
+不需要真实的邮件服务器。
+"""
+import time
+import smtplib
+import threading
+import socketserver
+from email import message_from_bytes
+from email.header import decode_header, make_header
+
+import pytest
+
+from boss_sentinel.config import EmailConfig
+from boss_sentinel.notifier import EmailNotifier, create_detection_notification
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """最小SMTP会话：EHLO/AUTH/MAIL/RCPT/DATA/RSET/NOOP/QUIT"""
+
+    def _reply(self, line: str) -> None:
+        self.wfile.write((line + "\r\n").encode("ascii"))
+
+    def handle(self):
+        server = self.server
+        server.connections += 1
+        self._reply("220 localhost stand-in")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("ascii", "replace").strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                self._reply("250-localhost")
+                self._reply("250 AUTH PLAIN")
+            elif command.startswith("AUTH"):
+                self._reply("235 ok")
+            elif command.startswith("DATA"):
+                self._reply("354 end with .")
+                data = b""
+                while not data.endswith(b"\r\n.\r\n"):
+                    chunk = self.rfile.readline()
+                    if not chunk:
+                        return
+                    data += chunk
+                server.messages.append(message_from_bytes(data[:-5].replace(b"\r\n..", b"\r\n.")))
+                self._reply("250 queued")
+                if server.drop_after_message:
+                    # 模拟服务器在空闲时断开连接
+                    return
+            elif command.startswith("QUIT"):
+                self._reply("221 bye")
+                return
+            else:
+                self._reply("250 ok")
+
+
+class _SMTPStandIn(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+        self.messages = []
+        self.connections = 0
+        self.drop_after_message = False
+
+
+@pytest.fixture
+def smtp_server():
+    server = _SMTPStandIn()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _config(server, **kwargs) -> EmailConfig:
+    options = dict(
+        sender="sentinel@example.com", receiver="me@example.com",
+        smtp_server="127.0.0.1", smtp_port=server.server_address[1],
+        username="", password="", use_tls=False, timeout=5.0,
+        coalesce_window=60.0, max_per_hour=0,
+    )
+    options.update(kwargs)
+    return EmailConfig(**options)
+
+
+def _factory(host, port, timeout):
+    return smtplib.SMTP(host, port, timeout=timeout)
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return predicate()
+
+
+def _body(message) -> str:
+    part = message.get_payload()[0]
+    return part.get_payload(decode=True).decode("utf-8")
+
+
+class TestEmailNotifier:
+    """EmailNotifier 测试"""
+
+    def test_notify_does_not_block(self, smtp_server):
+        notifier = EmailNotifier(_config(smtp_server), smtp_factory=_factory)
+        start = time.perf_counter()
+        assert notifier.notify("boss", 0.9, 0)
+        assert time.perf_counter() - start < 0.1
+
+        assert _wait_for(lambda: len(smtp_server.messages) == 1)
+        notifier.close()
+        message = smtp_server.messages[0]
+        assert str(make_header(decode_header(message["Subject"]))) == "哨兵系统检测到已知人物"
+        assert "boss" in _body(message)
+
+    def test_connection_is_reused(self, smtp_server):
+        notifier = EmailNotifier(_config(smtp_server), smtp_factory=_factory)
+        assert notifier.send("a", "first")
+        assert notifier.send("b", "second")
+        notifier.close()
+        assert len(smtp_server.messages) == 2
+        assert smtp_server.connections == 1
+
+    def test_reconnects_after_server_drop(self, smtp_server):
+        smtp_server.drop_after_message = True
+        notifier = EmailNotifier(_config(smtp_server), smtp_factory=_factory)
+        assert notifier.send("a", "first")
+        assert notifier.send("b", "second")
+        notifier.close()
+        assert len(smtp_server.messages) == 2
+        assert smtp_server.connections == 2
+
+    def test_repeated_detections_are_coalesced(self, smtp_server):
+        notifier = EmailNotifier(_config(smtp_server, coalesce_window=60.0), smtp_factory=_factory)
+        for similarity in (0.8, 0.95, 0.85):
+            notifier.notify("boss", similarity, 1)
+        assert _wait_for(lambda: len(smtp_server.messages) >= 1)
+        notifier.close()
+
+        # 第一次检测立即发送，窗口内的其余检测在关闭时合并为一封
+        assert len(smtp_server.messages) == 2
+        body = _body(smtp_server.messages[1])
+        assert "95.00%" in body
+        assert "合并的重复检测: 1 次" in body
+        assert notifier.stats['coalesced'] == 1
+
+    def test_rate_limit(self, smtp_server):
+        notifier = EmailNotifier(_config(smtp_server, coalesce_window=0.0, max_per_hour=2),
+                                 smtp_factory=_factory)
+        for person in ("a", "b", "c"):
+            notifier.notify(person, 0.9, 0)
+        assert _wait_for(lambda: len(smtp_server.messages) == 2)
+        time.sleep(0.2)
+        assert len(smtp_server.messages) == 2
+        assert notifier.stats['rate_limited'] == 1
+
+        # 关闭时发送被限流保留的检测
+        notifier.close()
+        assert len(smtp_server.messages) == 3
+
+    def test_unexpected_error_does_not_stop_worker(self, smtp_server):
+        # 非ASCII密码会让 smtplib 在登录时抛出 UnicodeEncodeError
+        notifier = EmailNotifier(_config(smtp_server, username="user", password="密码"),
+                                 smtp_factory=_factory)
+        notifier.notify("boss", 0.9, 0)
+        assert _wait_for(lambda: notifier.stats['failed'] == 1)
+        assert notifier._thread.is_alive()
+
+        notifier.config.password = "password"
+        notifier.notify("other", 0.9, 0)
+        assert _wait_for(lambda: len(smtp_server.messages) == 1)
+        notifier.close()
+
+
+def test_create_detection_notification():
+    notification = create_detection_notification("boss", 0.875, 2, repeats=3)
+    assert "boss" in notification['body']
+    assert "87.50%" in notification['body']
+    assert "合并的重复检测: 3 次" in notification['body']